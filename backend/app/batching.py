@@ -0,0 +1,118 @@
+"""Micro-batching of concurrent frame solves.
+
+Requests that arrive within a short window are solved together: their reduced
+stiffness matrices are stacked into one block-diagonal sparse system and
+factorized with a single SuperLU call, amortizing per-solve overhead when many
+frames are simulated at once. If the combined system is singular the
+batch falls back to solving each request on its own so only the unstable
+model(s) report an error.
+
+Only large systems (above ``DENSE_SOLVE_MAX_DOF``) that arrive while another
+large solve is in flight are queued. Small systems, and a lone large one, are
+solved directly so a single client never waits for the batching window.
+"""
+from __future__ import annotations
+import asyncio
+from typing import List, Tuple
+import numpy as np
+import scipy.sparse as sp
+from starlette.concurrency import run_in_threadpool
+
+from .simulation import DENSE_SOLVE_MAX_DOF, AssemblyError, solve_reduced
+
+MAX_BATCH = 32         # most systems combined into one factorization
+MAX_WAIT_MS = 5.0      # how long the first request in a batch waits for company
+
+_Job = Tuple[sp.spmatrix, np.ndarray, asyncio.Future]
+
+
+def solve_batch(systems: List[Tuple[sp.spmatrix, np.ndarray]]) -> List[np.ndarray | Exception]:
+    """Solve several reduced systems; returns a solution or the exception per system."""
+    if len(systems) > 1:
+        K = sp.block_diag([K_ff for K_ff, _ in systems], format="csc")
+        F = np.concatenate([F_f for _, F_f in systems])
+        try:
+            U = solve_reduced(K, F)
+        except AssemblyError:
+            pass  # at least one model is unstable; isolate it below
+        else:
+            splits = np.cumsum([F_f.shape[0] for _, F_f in systems])[:-1]
+            return np.split(U, splits)
+    results: List[np.ndarray | Exception] = []
+    for K_ff, F_f in systems:
+        try:
+            results.append(solve_reduced(K_ff, F_f))
+        except AssemblyError as e:
+            results.append(e)
+    return results
+
+
+class SolveBatcher:
+    """Collects reduced systems from concurrent requests and solves them in batches."""
+
+    def __init__(self, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._queue: asyncio.Queue[_Job] | None = None
+        self._task: asyncio.Task | None = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._active = 0  # large solves in flight (direct or queued)
+
+    def _ensure_running(self) -> asyncio.Queue[_Job]:
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._queue = asyncio.Queue()
+            self._task = loop.create_task(self._run(self._queue))
+        return self._queue
+
+    async def solve(self, K_ff: sp.spmatrix, F_f: np.ndarray) -> np.ndarray:
+        if K_ff.shape[0] <= DENSE_SOLVE_MAX_DOF:
+            return await run_in_threadpool(solve_reduced, K_ff, F_f)
+        self._active += 1
+        try:
+            if self._active == 1:
+                # Nothing to batch with: solve now instead of waiting the window
+                return await run_in_threadpool(solve_reduced, K_ff, F_f)
+            queue = self._ensure_running()
+            future = asyncio.get_running_loop().create_future()
+            await queue.put((K_ff, F_f, future))
+            return await future
+        finally:
+            self._active -= 1
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+        self._task = None
+        self._queue = None
+        self._loop = None
+
+    async def _run(self, queue: asyncio.Queue[_Job]) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            jobs = [await queue.get()]
+            deadline = loop.time() + self.max_wait
+            while len(jobs) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    jobs.append(await asyncio.wait_for(queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            try:
+                results = await run_in_threadpool(solve_batch, [(K, F) for K, F, _ in jobs])
+            except Exception as e:  # unexpected failure: fail the whole batch, keep serving
+                results = [e] * len(jobs)
+            for (_, _, future), result in zip(jobs, results):
+                if future.done():
+                    continue  # request was cancelled (client went away)
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -1,15 +1,26 @@
 import os
-import json
 import time
-import re
+import string
+import tempfile
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import asynccontextmanager
 from pathlib import Path
-from fastapi import FastAPI, HTTPException
+import anyio.to_thread
+import numpy as np
+import orjson
+from email.utils import formatdate, parsedate_to_datetime
+from fastapi import FastAPI, HTTPException, Request
 from fastapi import Body
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, Response, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.concurrency import run_in_threadpool
+from pydantic import TypeAdapter, ValidationError
 
 from . import schemas
-from .simulation import simulate_structure
+from .simulation import DENSE_SOLVE_MAX_DOF, assemble_frame, recover_frame, solve_reduced
+from .batching import SolveBatcher
 from .truss_solver import solve_truss, TrussError
 import logging
 
@@ -20,7 +31,28 @@ if not logger.handlers:
     logger.addHandler(handler)
 logger.setLevel(logging.INFO)
 
-app = FastAPI(title="Motorcycle Frame Simulator API", version="0.1.0")
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    global _materials_checked_at
+    # Sync endpoints (solver calls) run in the anyio worker pool; make sure it is
+    # at least as wide as the machine so concurrent solves are not queued.
+    limiter = anyio.to_thread.current_default_thread_limiter()
+    limiter.total_tokens = max(limiter.total_tokens, os.cpu_count() or 1)
+    # Precompute the materials catalog response so the first request is a cache hit.
+    try:
+        _reload_materials()
+        _materials_checked_at = time.monotonic()
+    except (OSError, orjson.JSONDecodeError) as e:
+        logger.warning(f"Could not preload materials.json: {e}")
+    yield
+    await _solve_batcher.stop()
+
+app = FastAPI(
+    title="Motorcycle Frame Simulator API",
+    version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
+)
 
 # Allow all origins during early development (tighten later)
 app.add_middleware(
@@ -35,39 +67,131 @@ app.add_middleware(
 async def health():
     return {"status": "ok"}
 
+_solve_batcher = SolveBatcher()
+
+# Process-wide LRU of recent results keyed by a hash of the input: the frontend
+# often re-submits an unchanged model, which then costs no solve at all. Results
+# are stored as encoded response bodies, so a hit is not re-serialized either.
+SIM_CACHE_SIZE = 128
+_sim_cache: OrderedDict[bytes, bytes] = OrderedDict()
+_sim_cache_lock = threading.Lock()
+
+def _simulation_key(payload: schemas.SimulationInput) -> bytes:
+    return hashlib.blake2b(orjson.dumps(payload.model_dump(), option=orjson.OPT_SORT_KEYS), digest_size=16).digest()
+
+def _sim_cache_get(key: bytes) -> bytes | None:
+    with _sim_cache_lock:
+        result = _sim_cache.get(key)
+        if result is not None:
+            _sim_cache.move_to_end(key)
+        return result
+
+def _sim_cache_put(key: bytes, body: bytes) -> None:
+    with _sim_cache_lock:
+        _sim_cache[key] = body
+        _sim_cache.move_to_end(key)
+        while len(_sim_cache) > SIM_CACHE_SIZE:
+            _sim_cache.popitem(last=False)
+
+def _simulate_frame_unbatched(payload: schemas.SimulationInput):
+    """Assemble a frame and, unless it is large enough to batch, solve and recover it too.
+
+    Returns (system, result); result is None when the reduced system should go
+    through the batcher. Keeps small frames to a single threadpool hop.
+    """
+    system = assemble_frame(payload)
+    n_free = system.K_ff.shape[0]
+    if n_free > DENSE_SOLVE_MAX_DOF:
+        return system, None
+    U_f = solve_reduced(system.K_ff, system.F_f) if n_free else np.zeros(0)
+    return system, recover_frame(system, U_f)
+
 @app.post("/simulate", response_model=schemas.SimulationResult)
 async def simulate(payload: schemas.SimulationInput):
-    """Run selected structural analysis (frame or truss)."""
+    """Run selected structural analysis (frame or truss).
+
+    CPU-bound work runs in the threadpool so the event loop is never blocked.
+    Large frame solves from concurrent requests are micro-batched into a single
+    sparse factorization (see ``batching.SolveBatcher``); small frames are
+    assembled, solved and recovered in one threadpool call. Repeated identical
+    payloads are answered from an LRU cache; errors are not cached.
+
+    The body is encoded here and returned as a Response: results are built with
+    model_construct, and going through response_model would dump and re-validate
+    them. response_model is kept for the OpenAPI schema.
+    """
+    key = _simulation_key(payload)
+    body = _sim_cache_get(key)
+    if body is not None:
+        return Response(content=body, media_type="application/json")
     if payload.analysis_type == 'truss':
-        return solve_truss(payload)
-    # default fallback to frame
-    return simulate_structure(payload)
+        result = await run_in_threadpool(solve_truss, payload)
+    else:
+        # default fallback to frame
+        system, result = await run_in_threadpool(_simulate_frame_unbatched, payload)
+        if result is None:
+            U_f = await _solve_batcher.solve(system.K_ff, system.F_f)
+            result = await run_in_threadpool(recover_frame, system, U_f)
+    body = result.model_dump_json().encode()
+    _sim_cache_put(key, body)
+    return Response(content=body, media_type="application/json")
 
 
 # ----------------------------- Design Save / Load -----------------------------
 DESIGNS_DIR = Path(__file__).resolve().parent.parent / "designs"
 DESIGNS_DIR.mkdir(exist_ok=True)
 
-_SAFE_NAME_RE = re.compile(r"^[A-Za-z0-9_-]+$")
+_SAFE_NAME_CHARS = frozenset(string.ascii_letters + string.digits + "-_")
+
+_design_adapter = TypeAdapter(schemas.Design)
+_DESIGN_FIELDS = frozenset(schemas.Design.model_fields)
 
 def _design_path(name: str) -> Path:
-    if not _SAFE_NAME_RE.match(name):
+    if not name or not _SAFE_NAME_CHARS.issuperset(name):
         raise HTTPException(status_code=400, detail="Invalid design name (use letters, numbers, hyphen, underscore)")
     return DESIGNS_DIR / f"{name}.json"
 
+# In-memory {name: mtime} index of the designs directory. Rebuilt with a single
+# os.scandir pass when the directory mtime changes (files added/removed);
+# save_design keeps it current for its own writes.
+_design_index: dict[str, float] | None = None
+_design_index_dir_mtime: float | None = None
+DESIGN_LIST_CHUNK = 256  # listing entries serialized per streamed chunk
+
+def _scan_designs() -> dict[str, float]:
+    index: dict[str, float] = {}
+    with os.scandir(DESIGNS_DIR) as it:
+        for entry in it:
+            if not entry.name.endswith(".json"):
+                continue
+            try:
+                if entry.is_file():
+                    index[entry.name[:-5]] = entry.stat().st_mtime
+            except OSError:
+                continue
+    return index
+
 @app.get("/designs", response_model=list[schemas.DesignListItem])
 async def list_designs():
-    items: list[schemas.DesignListItem] = []
-    for p in DESIGNS_DIR.glob("*.json"):
-        try:
-            stat = p.stat()
-            name = p.stem
-            items.append(schemas.DesignListItem(name=name, modified=stat.st_mtime))
-        except OSError:
-            continue
-    # newest first
-    items.sort(key=lambda x: x.modified, reverse=True)
-    return items
+    global _design_index, _design_index_dir_mtime
+    dir_mtime = DESIGNS_DIR.stat().st_mtime
+    if _design_index is None or dir_mtime != _design_index_dir_mtime:
+        _design_index = _scan_designs()
+        _design_index_dir_mtime = dir_mtime
+    # newest first; snapshot so concurrent saves don't mutate what is streamed
+    entries = sorted(_design_index.items(), key=lambda kv: kv[1], reverse=True)
+    return StreamingResponse(_stream_design_list(entries), media_type="application/json")
+
+async def _stream_design_list(entries: list[tuple[str, float]]):
+    """Yield the listing as a JSON array, a chunk of entries at a time."""
+    yield b"["
+    for start in range(0, len(entries), DESIGN_LIST_CHUNK):
+        chunk = b",".join(
+            orjson.dumps({"name": name, "modified": mtime})
+            for name, mtime in entries[start:start + DESIGN_LIST_CHUNK]
+        )
+        yield chunk if start == 0 else b"," + chunk
+    yield b"]"
 
 @app.get("/designs/{name}", response_model=schemas.Design)
 async def load_design(name: str):
@@ -75,28 +199,31 @@ async def load_design(name: str):
     if not path.exists():
         raise HTTPException(status_code=404, detail="Design not found")
     try:
-        with path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
+        data = orjson.loads(path.read_bytes())
     except OSError as e:
         raise HTTPException(status_code=500, detail=f"Read error: {e}")
     data["name"] = name
     data["timestamp"] = path.stat().st_mtime
     try:
-        return schemas.Design(**data)
+        return _design_adapter.validate_python(data)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Corrupt design file: {e}")
 
 @app.post("/designs/{name}", response_model=schemas.Design)
-async def save_design(name: str, design: dict = Body(...)):
+async def save_design(name: str, design: dict = Body(...), durable: bool = False):
     """Persist a design JSON. Accepts a loose dict for forward compatibility.
 
     We validate after injecting enforced fields, so missing optional view state
-    does not cause 422 errors.
+    does not cause 422 errors. Writes are atomic (temp file + rename); pass
+    ``durable=true`` to also fsync before returning.
     """
+    global _design_index_dir_mtime
     path = _design_path(name)
     if not isinstance(design, dict):
         raise HTTPException(status_code=400, detail="Invalid payload")
-    payload = dict(design)
+    # Only Design's own top-level fields are persisted, whichever path below
+    # writes the file
+    payload = {k: design[k] for k in design.keys() & _DESIGN_FIELDS}
     payload["name"] = name
     payload.setdefault("unitSystem", "IPS")
     payload.setdefault("analysisType", "truss")
@@ -106,101 +233,175 @@ async def save_design(name: str, design: dict = Body(...)):
     payload.setdefault("masses", [])
     payload.setdefault("gridSpacing", 1.0)
     payload["timestamp"] = time.time()
-    # Attempt validation (will raise if structurally incompatible)
+    # Serialize the payload as-is and validate those bytes strictly: if no field
+    # needed coercion they are written directly, skipping a model_dump rebuild.
+    data = orjson.dumps(payload, option=orjson.OPT_INDENT_2)
     try:
-        validated = schemas.Design(**payload)
-    except Exception as e:
-        raise HTTPException(status_code=422, detail=f"Validation failed: {e}")
+        validated = _design_adapter.validate_json(data, strict=True)
+    except ValidationError:
+        # Lax validation (will raise if structurally incompatible); persist the
+        # normalized values so the file holds what validation coerced them to.
+        try:
+            validated = _design_adapter.validate_python(payload)
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=f"Validation failed: {e}")
+        data = orjson.dumps(validated.model_dump(), option=orjson.OPT_INDENT_2)
     # Ensure directory exists
     path.parent.mkdir(parents=True, exist_ok=True)
+    # Write to a temp file and rename over the target: readers never see a
+    # partial file, without paying for an fsync on every save. The temp name is
+    # unique, so concurrent saves of one design (several workers) never share it.
+    tmp = None
     try:
-        with path.open("w", encoding="utf-8") as f:
-            json.dump(validated.dict(), f, indent=2)
-            f.flush()
-            os.fsync(f.fileno())
+        dir_mtime_before = DESIGNS_DIR.stat().st_mtime
+        with tempfile.NamedTemporaryFile(dir=path.parent, prefix=f".{name}.", suffix=".tmp", delete=False) as f:
+            tmp = f.name
+            f.write(data)
+            if durable:
+                f.flush()
+                os.fsync(f.fileno())
+        os.replace(tmp, path)
+        if _design_index is not None:
+            _design_index[name] = path.stat().st_mtime
+            # The rename bumps the directory mtime; if the index was current
+            # before, it still is, so the next listing needs no rescan.
+            if dir_mtime_before == _design_index_dir_mtime:
+                _design_index_dir_mtime = DESIGNS_DIR.stat().st_mtime
         print(f"[design-save] Saved design '{name}' to {path}")
     except OSError as e:
+        if tmp is not None:
+            Path(tmp).unlink(missing_ok=True)
         raise HTTPException(status_code=500, detail=f"Write error: {e}")
     return validated
 
 # ----------------------------- Materials Catalog -----------------------------
+MATERIALS_PATH = Path(__file__).resolve().parent.parent.parent / "materials.json"
+
 _materials_cache: list[dict] | None = None
 _materials_mtime: float | None = None
+_materials_json_bytes: bytes | None = None  # pre-encoded {"materials": [...]} response body
+_materials_etag: str | None = None
+_materials_checked_at: float = 0.0  # monotonic time of last mtime check
+MATERIALS_STAT_TTL = 1.0  # seconds between mtime checks on the warm path
+
+def _positive_dims(materials: list[dict], keys: tuple[str, ...]) -> tuple[list[dict], np.ndarray]:
+    """Entries whose `keys` are all positive numbers, plus those values as an (n, len(keys)) array."""
+    picked = [
+        m for m in materials
+        if all(isinstance(m.get(k), (int, float)) and m.get(k) > 0 for k in keys)
+    ]
+    dims = np.array([[m[k] for k in keys] for m in picked], dtype=float).reshape(len(picked), len(keys))
+    return picked, dims
+
+def _augment_materials(materials_list: list[dict]) -> tuple[bool, int]:
+    """Fill in missing E_psi / I_in4 in place.
+
+    Second moments for all tubes missing I_in4 are computed in one vectorized
+    pass per shape. Returns (updated, number of I values computed).
+    """
+    updated = False
+    for m in materials_list:
+        if m.get("E_psi") is None:
+            grade = (m.get("grade") or "").upper()
+            m["E_psi"] = 29_700_000 if "4130" in grade else 29_000_000
+            updated = True
+    missing_i = [m for m in materials_list if m.get("I_in4") is None]
+    computed_count = 0
+
+    rounds, dims = _positive_dims(
+        [m for m in missing_i if m.get("shape") == "round_tube"],
+        ("outer_diameter_in", "wall_thickness_in"),
+    )
+    od, t = dims[:, 0], dims[:, 1]
+    id_ = np.maximum(od - 2 * t, 0.0)
+    for m, I in zip(rounds, (np.pi / 64.0) * (od**4 - id_**4)):
+        m["I_in4"] = round(float(I), 6)
+    computed_count += len(rounds)
+
+    squares, dims = _positive_dims(
+        [m for m in missing_i if m.get("shape") == "square_tube"],
+        ("outer_width_in", "outer_height_in", "wall_thickness_in"),
+    )
+    ow, t = dims[:, 0], dims[:, 2]
+    iw = np.maximum(ow - 2 * t, 0.0)
+    for m, I in zip(squares, (ow**4 - iw**4) / 12.0):
+        m["I_in4"] = round(float(I), 6)
+    computed_count += len(squares)
+
+    return updated or computed_count > 0, computed_count
+
+def _reload_materials(force_rewrite: bool = False) -> None:
+    """Read, augment and (if needed) rewrite materials.json, then refresh the response cache."""
+    global _materials_cache, _materials_mtime, _materials_json_bytes, _materials_etag
+    data = orjson.loads(MATERIALS_PATH.read_bytes())
+    materials_list = data.get("materials", [])
+    updated, computed_count = _augment_materials(materials_list)
+    if updated or force_rewrite:
+        try:
+            data["materials"] = materials_list
+            MATERIALS_PATH.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            if updated:
+                logger.info(f"Augmented materials.json with computed fields (E/I). Newly computed I for {computed_count} entries.")
+            else:
+                logger.info("materials.json rewrite forced (no new fields computed).")
+        except OSError:
+            logger.warning("Failed to write augmented materials.json; using in-memory augmented data only.")
+    _materials_cache = materials_list
+    _materials_mtime = MATERIALS_PATH.stat().st_mtime
+    _materials_json_bytes = orjson.dumps({"materials": _materials_cache})
+    _materials_etag = f'W/"{int(_materials_mtime * 1e6):x}"'
+
+def _materials_not_modified(request: Request) -> bool:
+    """True if the client's conditional headers match the cached catalog."""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return _materials_etag in (t.strip() for t in if_none_match.split(","))
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since:
+        try:
+            return int(_materials_mtime) <= parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+def _materials_response(request: Request) -> Response:
+    headers = {
+        "ETag": _materials_etag,
+        "Last-Modified": formatdate(_materials_mtime, usegmt=True),
+    }
+    if _materials_not_modified(request):
+        return Response(status_code=304, headers=headers)
+    return Response(content=_materials_json_bytes, media_type="application/json", headers=headers)
 
 @app.get("/materials")
-async def get_materials(refresh: bool = False, force_rewrite: bool = False):
+async def get_materials(request: Request, refresh: bool = False, force_rewrite: bool = False):
     """Serve materials.json entries.
 
+    The catalog is loaded and augmented at startup; the encoded response body
+    is cached together with a weak ETag derived from the file mtime, and
+    matching If-None-Match / If-Modified-Since requests get a 304 with no body.
+
     Args:
         refresh: Bypass cache and re-read file, recomputing any missing fields.
         force_rewrite: Force writing file back even if nothing new was computed (normalizes formatting).
     """
-    global _materials_cache, _materials_mtime
-    root_dir = Path(__file__).resolve().parent.parent.parent
-    mat_path = root_dir / "materials.json"
-    if not mat_path.exists():
+    global _materials_checked_at
+    now = time.monotonic()
+    if (_materials_json_bytes is not None and not refresh and not force_rewrite
+            and now - _materials_checked_at < MATERIALS_STAT_TTL):
+        return _materials_response(request)
+    if not MATERIALS_PATH.exists():
         raise HTTPException(status_code=404, detail="materials.json not found")
     try:
-        stat = mat_path.stat()
         if refresh:
             logger.info("/materials refresh requested; bypassing cache")
-        if _materials_cache is None or _materials_mtime != stat.st_mtime or refresh:
-            with mat_path.open("r", encoding="utf-8") as f:
-                data = json.load(f)
-            materials_list = data.get("materials", [])
-            updated = False
-            computed_count = 0
-            for m in materials_list:
-                if m.get("E_psi") is None:
-                    grade = (m.get("grade") or "").upper()
-                    m["E_psi"] = 29_700_000 if "4130" in grade else 29_000_000
-                    updated = True
-                if m.get("I_in4") is None:
-                    shape = m.get("shape")
-                    try:
-                        if shape == "round_tube":
-                            od = m.get("outer_diameter_in")
-                            t = m.get("wall_thickness_in")
-                            if od and t and od > 0 and t > 0:
-                                id_ = od - 2 * t
-                                if id_ < 0: id_ = 0
-                                I = (3.141592653589793 / 64.0) * (od**4 - id_**4)
-                                m["I_in4"] = round(I, 6)
-                                updated = True
-                                computed_count += 1
-                        elif shape == "square_tube":
-                            ow = m.get("outer_width_in")
-                            oh = m.get("outer_height_in")
-                            t = m.get("wall_thickness_in")
-                            if ow and oh and t and ow > 0 and oh > 0 and t > 0:
-                                iw = ow - 2 * t
-                                ih = oh - 2 * t
-                                if iw < 0: iw = 0
-                                if ih < 0: ih = 0
-                                I = (ow**4 - iw**4) / 12.0
-                                m["I_in4"] = round(I, 6)
-                                updated = True
-                                computed_count += 1
-                    except Exception:
-                        pass
-            if updated or force_rewrite:
-                try:
-                    data["materials"] = materials_list
-                    with mat_path.open("w", encoding="utf-8") as wf:
-                        json.dump(data, wf, indent=2)
-                    stat = mat_path.stat()
-                    if updated:
-                        logger.info(f"Augmented materials.json with computed fields (E/I). Newly computed I for {computed_count} entries.")
-                    else:
-                        logger.info("materials.json rewrite forced (no new fields computed).")
-                except OSError:
-                    logger.warning("Failed to write augmented materials.json; using in-memory augmented data only.")
-            _materials_cache = materials_list
-            _materials_mtime = stat.st_mtime
-        return {"materials": _materials_cache}
+        if _materials_cache is None or _materials_mtime != MATERIALS_PATH.stat().st_mtime or refresh:
+            _reload_materials(force_rewrite)
+        _materials_checked_at = now
+        return _materials_response(request)
     except OSError as e:
         raise HTTPException(status_code=500, detail=f"Error reading materials: {e}")
-    except json.JSONDecodeError as e:
+    except orjson.JSONDecodeError as e:
         raise HTTPException(status_code=500, detail=f"Malformed materials.json: {e}")
 
 # To run (dev): uvicorn backend.app.main:app --reload
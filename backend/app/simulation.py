@@ -17,12 +17,16 @@ Future improvements:
 - Modal / dynamic analysis.
 """
 from __future__ import annotations
-from typing import Dict, List, Tuple
-import math
+from typing import Dict, List, NamedTuple, Tuple
 import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from scipy.linalg import LinAlgError, cho_factor, cho_solve
 from . import schemas
 
 DOF_PER_NODE = 3  # u, v, theta
+DENSE_SOLVE_MAX_DOF = 300  # below this a dense Cholesky beats sparse LU setup cost
+SINGULAR_MESSAGE = "Global stiffness matrix is singular. Structure may be unstable or insufficient constraints."
 
 class AssemblyError(Exception):
     pass
@@ -34,77 +38,119 @@ def _node_dof_indices(node_index: int) -> Tuple[int, int, int]:
 def _build_node_index_map(nodes: List[schemas.NodeInput]) -> Dict[str, int]:
     return {n.id: i for i, n in enumerate(nodes)}
 
-def _element_stiffness(E: float, A: float, I: float, x1: float, y1: float, x2: float, y2: float) -> Tuple[np.ndarray, float, float, float]:
+def _element_stiffness_batch(E: np.ndarray, A: np.ndarray, I: np.ndarray,
+                             x1: np.ndarray, y1: np.ndarray, x2: np.ndarray, y2: np.ndarray
+                             ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Local, transformation and global stiffness matrices for N beams at once.
+
+    Returns (k_local, T, k_global), each of shape (N,6,6). k_global equals
+    T.T @ k_local @ T but is filled from closed-form entries rather than two
+    6x6 products per beam.
+    """
     dx = x2 - x1
     dy = y2 - y1
-    L = math.hypot(dx, dy)
-    if L <= 0:
+    L = np.hypot(dx, dy)
+    if np.any(L <= 0):
         raise AssemblyError("Zero length element")
     c = dx / L
     s = dy / L
-    # Local stiffness for 2D frame element (axial + bending)
     EA_L = E * A / L
     EI = E * I
     L2 = L * L
     L3 = L2 * L
-    k = np.zeros((6, 6), dtype=float)
-    # Axial terms
-    k[0,0] = k[3,3] = EA_L
-    k[0,3] = k[3,0] = -EA_L
-    # Bending terms
-    k[1,1] = k[4,4] = 12*EI / L3
-    k[1,4] = k[4,1] = -12*EI / L3
-    k[1,2] = k[2,1] = 6*EI / L2
-    k[1,5] = k[5,1] = 6*EI / L2
-    k[4,2] = k[2,4] = -6*EI / L2
-    k[4,5] = k[5,4] = -6*EI / L2
-    k[2,2] = 4*EI / L
-    k[5,5] = 4*EI / L
-    k[2,5] = k[5,2] = 2*EI / L
-    # Transformation matrix
-    T = np.array([
-        [ c, -s, 0, 0,  0, 0],
-        [ s,  c, 0, 0,  0, 0],
-        [ 0,  0, 1, 0,  0, 0],
-        [ 0,  0, 0, c, -s, 0],
-        [ 0,  0, 0, s,  c, 0],
-        [ 0,  0, 0, 0,  0, 1],
-    ], dtype=float)
-    k_global = T.T @ k @ T
-    return k_global, L, c, s
-
-def simulate_structure(inp: schemas.SimulationInput) -> schemas.SimulationResult:
+    n = L.shape[0]
+    k = np.zeros((n, 6, 6), dtype=float)
+    k[:, 0, 0] = k[:, 3, 3] = EA_L
+    k[:, 0, 3] = k[:, 3, 0] = -EA_L
+    k[:, 1, 1] = k[:, 4, 4] = 12*EI / L3
+    k[:, 1, 4] = k[:, 4, 1] = -12*EI / L3
+    k[:, 1, 2] = k[:, 2, 1] = 6*EI / L2
+    k[:, 1, 5] = k[:, 5, 1] = 6*EI / L2
+    k[:, 4, 2] = k[:, 2, 4] = -6*EI / L2
+    k[:, 4, 5] = k[:, 5, 4] = -6*EI / L2
+    k[:, 2, 2] = 4*EI / L
+    k[:, 5, 5] = 4*EI / L
+    k[:, 2, 5] = k[:, 5, 2] = 2*EI / L
+    T = np.zeros((n, 6, 6), dtype=float)
+    T[:, 0, 0] = T[:, 1, 1] = T[:, 3, 3] = T[:, 4, 4] = c
+    T[:, 0, 1] = T[:, 3, 4] = -s
+    T[:, 1, 0] = T[:, 4, 3] = s
+    T[:, 2, 2] = T[:, 5, 5] = 1.0
+    return k, T, _global_stiffness_batch(EA_L, 12*EI / L3, 6*EI / L2, 4*EI / L, 2*EI / L, c, s)
+
+def _global_stiffness_batch(a: np.ndarray, b: np.ndarray, d: np.ndarray, e: np.ndarray, f: np.ndarray,
+                            c: np.ndarray, s: np.ndarray) -> np.ndarray:
+    """Closed-form T.T @ k_local @ T for the T used above (rotation by -theta).
+
+    a = EA/L, b = 12EI/L^3, d = 6EI/L^2, e = 4EI/L, f = 2EI/L.
+    """
+    kxx = a*c*c + b*s*s
+    kyy = a*s*s + b*c*c
+    kxy = (b - a)*c*s
+    ds = d*s
+    dc = d*c
+    kg = np.empty((c.shape[0], 6, 6), dtype=float)
+    # Upper triangle (21 unique entries), mirrored below
+    upper = {
+        (0, 0): kxx, (0, 1): kxy, (0, 2): ds, (0, 3): -kxx, (0, 4): -kxy, (0, 5): ds,
+        (1, 1): kyy, (1, 2): dc, (1, 3): -kxy, (1, 4): -kyy, (1, 5): dc,
+        (2, 2): e, (2, 3): -ds, (2, 4): -dc, (2, 5): f,
+        (3, 3): kxx, (3, 4): kxy, (3, 5): -ds,
+        (4, 4): kyy, (4, 5): -dc,
+        (5, 5): e,
+    }
+    for (i, j), v in upper.items():
+        kg[:, i, j] = v
+        kg[:, j, i] = v
+    return kg
+
+class FrameSystem(NamedTuple):
+    """Assembled frame model, split out so the reduced solve can run separately (e.g. batched)."""
+    nodes: List[schemas.NodeInput]
+    beams: List[schemas.BeamInput]
+    k_local: np.ndarray    # (N,6,6) local element stiffness
+    T: np.ndarray          # (N,6,6) element transformation
+    dof_maps: np.ndarray   # (N,6) global DOF indices per element
+    free_mask: np.ndarray  # (ndof,) True for unconstrained DOFs
+    K_ff: sp.csr_matrix    # reduced stiffness over free DOFs
+    F_f: np.ndarray        # reduced load vector
+
+def assemble_frame(inp: schemas.SimulationInput) -> FrameSystem:
+    """Assemble the reduced stiffness system for a frame model."""
     nodes = inp.nodes
-    beams = inp.beams
-    loads = inp.loads
+    beams = inp.beams if nodes else []
+    loads = inp.loads if nodes else []
     n_nodes = len(nodes)
-    if n_nodes == 0:
-        return schemas.SimulationResult(displacements=[], internal_forces=[])
 
     node_index = _build_node_index_map(nodes)
     ndof = n_nodes * DOF_PER_NODE
-    K = np.zeros((ndof, ndof), dtype=float)
     F = np.zeros(ndof, dtype=float)
 
-    # Assemble element stiffness
-    element_descriptors = []  # store for internal force recovery
+    # Assemble element stiffness as COO triplets; the frame stiffness matrix is
+    # very sparse (each beam only couples 6 DOF) so it is never stored densely.
+    # All element matrices are computed in one batched NumPy pass.
     for b in beams:
         if b.node_start not in node_index or b.node_end not in node_index:
             raise AssemblyError(f"Beam {b.id} references unknown node")
-        i = node_index[b.node_start]
-        j = node_index[b.node_end]
-        ni = nodes[i]
-        nj = nodes[j]
-        k_e, L, c, s = _element_stiffness(b.E, b.A, b.I, ni.x, ni.y, nj.x, nj.y)
-        dofs_i = _node_dof_indices(i)
-        dofs_j = _node_dof_indices(j)
-        dof_map = list(dofs_i + dofs_j)
-        for a in range(6):
-            Aidx = dof_map[a]
-            for bidx in range(6):
-                Bidx = dof_map[bidx]
-                K[Aidx, Bidx] += k_e[a, bidx]
-        element_descriptors.append((b, dof_map, k_e))
+    xs = np.array([n.x for n in nodes], dtype=float)
+    ys = np.array([n.y for n in nodes], dtype=float)
+    i_idx = np.array([node_index[b.node_start] for b in beams], dtype=np.intp)
+    j_idx = np.array([node_index[b.node_end] for b in beams], dtype=np.intp)
+    k_local, T, k_global = _element_stiffness_batch(
+        np.array([b.E for b in beams], dtype=float),
+        np.array([b.A for b in beams], dtype=float),
+        np.array([b.I for b in beams], dtype=float),
+        xs[i_idx], ys[i_idx], xs[j_idx], ys[j_idx],
+    )
+    offsets = np.arange(DOF_PER_NODE, dtype=np.intp)
+    dof_maps = np.empty((len(beams), 2 * DOF_PER_NODE), dtype=np.intp)
+    dof_maps[:, :DOF_PER_NODE] = i_idx[:, None] * DOF_PER_NODE + offsets
+    dof_maps[:, DOF_PER_NODE:] = j_idx[:, None] * DOF_PER_NODE + offsets
+    rows = np.repeat(dof_maps, 6, axis=1).ravel()
+    cols = np.tile(dof_maps, (1, 6)).ravel()
+    vals = k_global.ravel()
+
+    K = sp.coo_matrix((vals, (rows, cols)), shape=(ndof, ndof)).tocsr()  # duplicate (row, col) entries are summed
 
     # Assemble load vector
     for load in loads:
@@ -117,104 +163,86 @@ def simulate_structure(inp: schemas.SimulationInput) -> schemas.SimulationResult
         F[r] += load.Moment
 
     # Boundary conditions
-    constrained_dofs = set()
+    free_mask = np.ones(ndof, dtype=bool)
     for n in nodes:
-        idx = node_index[n.id]
-        ux, uy, r = _node_dof_indices(idx)
         if n.constraints:
-            if n.constraints.fix_x: constrained_dofs.add(ux)
-            if n.constraints.fix_y: constrained_dofs.add(uy)
-            if n.constraints.fix_rotation: constrained_dofs.add(r)
-    all_dofs = set(range(ndof))
-    free_dofs = sorted(list(all_dofs - constrained_dofs))
-
-    if len(free_dofs) == 0:
-        # All constrained: displacements zero
-        displacements = [schemas.NodeResult(id=n.id, ux=0.0, uy=0.0, rotation=0.0) for n in nodes]
-        internal = [schemas.BeamInternalForce(id=b.id, axial=0, shear_start=0, shear_end=0, moment_start=0, moment_end=0) for b in beams]
-        return schemas.SimulationResult(displacements=displacements, internal_forces=internal)
+            ux, uy, r = _node_dof_indices(node_index[n.id])
+            if n.constraints.fix_x: free_mask[ux] = False
+            if n.constraints.fix_y: free_mask[uy] = False
+            if n.constraints.fix_rotation: free_mask[r] = False
+    free_dofs = np.flatnonzero(free_mask)
 
     # Reduced system
-    K_ff = K[np.ix_(free_dofs, free_dofs)]
+    K_ff = K[free_dofs, :][:, free_dofs]
     F_f = F[free_dofs]
-
-    # Solve
+    return FrameSystem(nodes, beams, k_local, T, dof_maps, free_mask, K_ff, F_f)
+
+def solve_reduced(K_ff: sp.spmatrix, F_f: np.ndarray) -> np.ndarray:
+    """Solve K_ff @ U_f = F_f, raising AssemblyError for a singular (unstable) system."""
+    if K_ff.shape[0] <= DENSE_SOLVE_MAX_DOF:
+        # K_ff is symmetric positive definite for a properly constrained frame:
+        # Cholesky does half the work of LU. Not PD -> fall through to LU.
+        try:
+            c, low = cho_factor(K_ff.toarray(), lower=True, overwrite_a=True, check_finite=False)
+            U_f = cho_solve((c, low), F_f, check_finite=False)
+            if np.all(np.isfinite(U_f)):
+                return U_f
+        except LinAlgError:
+            pass
+    # Sparse LU; SuperLU raises on an exactly singular factor
     try:
-        U_f = np.linalg.solve(K_ff, F_f)
-    except np.linalg.LinAlgError:
+        U_f = spla.splu(sp.csc_matrix(K_ff)).solve(F_f)
+    except RuntimeError:
+        U_f = None
+    if U_f is None or not np.all(np.isfinite(U_f)):
         # Singular matrix (e.g., mechanism)
-        raise AssemblyError("Global stiffness matrix is singular. Structure may be unstable or insufficient constraints.")
+        raise AssemblyError(SINGULAR_MESSAGE)
+    return U_f
+
+def recover_frame(system: FrameSystem, U_f: np.ndarray) -> schemas.SimulationResult:
+    """Build node displacements and beam end forces from the reduced solution."""
+    nodes = system.nodes
+    beams = system.beams
+    # Results are built with model_construct: the solver output is already
+    # well-typed floats, so per-object Pydantic validation is skipped.
+    if system.K_ff.shape[0] == 0:
+        # All constrained: displacements zero
+        displacements = [schemas.NodeResult.model_construct(id=n.id, ux=0.0, uy=0.0, rotation=0.0) for n in nodes]
+        internal = [schemas.BeamInternalForce.model_construct(id=b.id, axial=0.0, shear_start=0.0, shear_end=0.0, moment_start=0.0, moment_end=0.0) for b in beams]
+        return schemas.SimulationResult.model_construct(displacements=displacements, internal_forces=internal)
 
     # Reconstruct full displacement vector
-    U = np.zeros(ndof, dtype=float)
-    for idx, dof in enumerate(free_dofs):
-        U[dof] = U_f[idx]
+    U = np.zeros(system.free_mask.shape[0], dtype=float)
+    U[system.free_mask] = U_f
 
     # Build node results
-    node_results: List[schemas.NodeResult] = []
-    for n in nodes:
-        i = node_index[n.id]
-        ux_d, uy_d, r_d = _node_dof_indices(i)
-        node_results.append(
-            schemas.NodeResult(
-                id=n.id,
-                ux=U[ux_d],
-                uy=U[uy_d],
-                rotation=U[r_d],
-            )
+    node_results: List[schemas.NodeResult] = [
+        schemas.NodeResult.model_construct(id=n.id, ux=ux, uy=uy, rotation=r)
+        for n, (ux, uy, r) in zip(nodes, U.reshape(-1, DOF_PER_NODE).tolist())
+    ]
+
+    # Internal forces (approximate) from local end forces f = k_local @ T @ u,
+    # reusing the element matrices cached at assembly; all beams in one pass.
+    u_elems = U[system.dof_maps]  # (N, 6) element DOF displacements in one gather
+    f_local = np.einsum('nij,njk,nk->ni', system.k_local, system.T, u_elems)
+    # sign: axial + tension, - compression; end shear/moment flipped to member convention
+    forces = np.column_stack((f_local[:, 0], f_local[:, 1], -f_local[:, 4], f_local[:, 2], -f_local[:, 5]))
+    beam_results: List[schemas.BeamInternalForce] = [
+        schemas.BeamInternalForce.model_construct(
+            id=beam.id,
+            axial=axial,
+            shear_start=shear_start,
+            shear_end=shear_end,
+            moment_start=moment_start,
+            moment_end=moment_end,
         )
+        for beam, (axial, shear_start, shear_end, moment_start, moment_end) in zip(beams, forces.tolist())
+    ]
 
-    # Internal forces (approximate). Recompute element geometry and recover axial force using extension for clear tension/compression sign.
-    beam_results: List[schemas.BeamInternalForce] = []
-    for beam, dof_map, _k_global in element_descriptors:
-        ni = nodes[node_index[beam.node_start]]
-        nj = nodes[node_index[beam.node_end]]
-        dx0 = nj.x - ni.x
-        dy0 = nj.y - ni.y
-        L = math.hypot(dx0, dy0)
-        if L <= 0:
-            axial = 0.0
-            shear_start = shear_end = moment_start = moment_end = 0.0
-        else:
-            # Original direction cosines
-            c = dx0 / L
-            s = dy0 / L
-            # Deformed positions (translations only; rotation does not shift centroid)
-            ux_i, uy_i, _r_i = _node_dof_indices(node_index[beam.node_start])
-            ux_j, uy_j, _r_j = _node_dof_indices(node_index[beam.node_end])
-            x1_def = ni.x + U[ux_i]
-            y1_def = ni.y + U[uy_i]
-            x2_def = nj.x + U[ux_j]
-            y2_def = nj.y + U[uy_j]
-            L_def = math.hypot(x2_def - x1_def, y2_def - y1_def)
-            # Build local force vector for small-displacement axial sign recovery.
-            k_glob, _Ldummy, c2, s2 = _element_stiffness(beam.E, beam.A, beam.I, ni.x, ni.y, nj.x, nj.y)
-            T = np.array([
-                [ c2, -s2, 0, 0,   0, 0],
-                [ s2,  c2, 0, 0,   0, 0],
-                [ 0,   0,  1, 0,   0, 0],
-                [ 0,   0,  0, c2, -s2,0],
-                [ 0,   0,  0, s2,  c2,0],
-                [ 0,   0,  0, 0,   0, 1],
-            ], dtype=float)
-            k_local = T @ k_glob @ T.T
-            u_elem_global = U[dof_map]
-            u_local = T @ u_elem_global
-            f_local = k_local @ u_local
-            axial = f_local[0]  # sign: + tension, - compression
-            shear_start = f_local[1]
-            moment_start = f_local[2]
-            shear_end = -f_local[4]
-            moment_end = -f_local[5]
-        beam_results.append(
-            schemas.BeamInternalForce(
-                id=beam.id,
-                axial=axial,
-                shear_start=shear_start,
-                shear_end=shear_end,
-                moment_start=moment_start,
-                moment_end=moment_end,
-            )
-        )
+    return schemas.SimulationResult.model_construct(displacements=node_results, internal_forces=beam_results)
 
-    return schemas.SimulationResult(displacements=node_results, internal_forces=beam_results)
+def simulate_structure(inp: schemas.SimulationInput) -> schemas.SimulationResult:
+    system = assemble_frame(inp)
+    if system.K_ff.shape[0] == 0:
+        return recover_frame(system, np.zeros(0))
+    return recover_frame(system, solve_reduced(system.K_ff, system.F_f))
@@ -10,104 +10,203 @@ Returns axial forces (positive tension) mapped into SimulationResult format with
 shear/moment fields zeroed for compatibility.
 """
 from __future__ import annotations
-from typing import List, Dict, Tuple
-import math
+from functools import lru_cache
+from typing import Dict, NamedTuple, Tuple
 import numpy as np
+import scipy.sparse as sp
+import scipy.sparse.linalg as spla
+from scipy.sparse.csgraph import connected_components, reverse_cuthill_mckee
 from . import schemas
 
+try:  # optional (pip install .[umfpack]); UMFPACK factorizes large systems faster than SuperLU
+    from scikits import umfpack
+except ImportError:
+    umfpack = None
+
 class TrussError(Exception):
     pass
 
-def solve_truss(inp: schemas.SimulationInput) -> schemas.SimulationResult:
+def _assemble_truss(node_xy: np.ndarray, starts: np.ndarray, ends: np.ndarray,
+                    fix_x: np.ndarray, fix_y: np.ndarray) -> Tuple[sp.csc_matrix, np.ndarray, np.ndarray]:
+    """Assemble the joint equilibrium matrix from plain arrays.
+
+    Returns (A, row_x, col_of): row_x[i] is the Fx equation row of joint i (Fy is
+    row_x[i] + 1) and col_of[k] the column of unknown k, where unknowns are the
+    member axial forces (tension +) then reactions (per joint, x before y).
+    """
+    j = node_xy.shape[0]
+    m = starts.shape[0]
+    d = node_xy[ends] - node_xy[starts]  # (m, 2) member vectors
+    L = np.sqrt(np.einsum('ij,ij->i', d, d))
+    if (L <= 0).any():
+        raise TrussError("Zero-length member")
+    c = d[:, 0] / L
+    s = d[:, 1] / L
+
+    # Bandwidth-reducing order: reverse Cuthill-McKee over the joint graph puts
+    # connected joints next to each other. Equations follow the joint order and
+    # each unknown is placed by the first equation it appears in, so A is banded
+    # and the LU (natural column order) keeps its fill inside the band.
+    adj = sp.csr_matrix((np.ones(m), (starts, ends)), shape=(j, j))
+    node_rank = np.empty(j, dtype=np.intp)
+    node_rank[reverse_cuthill_mckee((adj + adj.T).tocsr(), symmetric_mode=True)] = np.arange(j)
+    row_x = 2 * node_rank  # Fx equation of each joint; Fy is row_x + 1
+
+    # Assemble joint equilibrium rows as sparse triplets: each member touches
+    # exactly 4 entries and each reaction 1, so A is never stored densely.
+    reaction_idx = np.flatnonzero(np.column_stack((fix_x, fix_y)).ravel())
+    reaction_rows = row_x[reaction_idx // 2] + reaction_idx % 2
+    r = reaction_rows.shape[0]
+    n_unknowns = m + r
+    first_row = np.concatenate((np.minimum(row_x[starts], row_x[ends]), reaction_rows))
+    col_of = np.empty(n_unknowns, dtype=np.intp)
+    col_of[np.argsort(first_row, kind="stable")] = np.arange(n_unknowns)
+    member_cols = col_of[:m]
+    rows = np.concatenate((row_x[starts], row_x[ends], row_x[starts] + 1, row_x[ends] + 1, reaction_rows))
+    cols = np.concatenate((member_cols, member_cols, member_cols, member_cols, col_of[m:]))
+    # tension pulls away from i along +c, opposite at j; unit reaction entries
+    data = np.concatenate((c, -c, s, -s, np.ones(r)))
+    A = sp.csc_matrix((data, (rows, cols)), shape=(2 * j, n_unknowns))  # duplicates summed
+    return A, row_x, col_of
+
+def _factorize(A: sp.csc_matrix):
+    """LU factorization of A with a reusable ``.solve(b)``.
+
+    Uses UMFPACK when scikit-umfpack is installed, otherwise SuperLU in the
+    natural (already band-reducing) column order.
+    """
+    if umfpack is not None:
+        return umfpack.splu(A)
+    return spla.splu(A, permc_spec="NATURAL")
+
+class TrussFactor(NamedTuple):
+    """Factorized equilibrium matrix of one truss geometry, reusable across load cases."""
+    lu: object              # object with .solve(b) (SuperLU or UMFPACK)
+    row_x: np.ndarray       # Fx equation row per joint (Fy is row_x + 1)
+    col_of: np.ndarray      # column of each unknown (members then reactions)
+
+@lru_cache(maxsize=32)
+def _factor_cached(xy: bytes, starts: bytes, ends: bytes, fix_x: bytes, fix_y: bytes) -> TrussFactor:
+    """Assemble and factorize, memoized on the raw bytes of the geometry arrays."""
+    A, row_x, col_of = _assemble_truss(
+        np.frombuffer(xy, dtype=float).reshape(-1, 2),
+        np.frombuffer(starts, dtype=np.intp),
+        np.frombuffer(ends, dtype=np.intp),
+        np.frombuffer(fix_x, dtype=bool),
+        np.frombuffer(fix_y, dtype=bool),
+    )
+    # An exactly singular A fails here with SuperLU (RuntimeError); UMFPACK only
+    # warns, and its non-finite solutions are rejected in solve_loads
+    try:
+        lu = _factorize(A)
+    except RuntimeError:
+        raise TrussError("Singular equilibrium system (unstable or indeterminate)") from None
+    return TrussFactor(lu, row_x, col_of)
+
+def _check_components(j: int, starts: np.ndarray, ends: np.ndarray,
+                      fix_x: np.ndarray, fix_y: np.ndarray) -> None:
+    """Reject trusses whose equilibrium matrix is singular by counting alone.
+
+    Joints in different connected pieces share no equations, so each piece must
+    be determinate on its own (m_c + r_c == 2 j_c), and a piece with more than
+    one joint needs at least 3 reaction components to be held as a rigid body.
+    Catches these before any assembly or factorization.
+    """
+    adj = sp.coo_matrix((np.ones(starts.shape[0]), (starts, ends)), shape=(j, j))
+    n_comp, labels = connected_components(adj, directed=False)
+    joints = np.bincount(labels, minlength=n_comp)
+    members = np.bincount(labels[starts], minlength=n_comp)
+    reactions = np.bincount(labels, weights=fix_x.astype(float) + fix_y, minlength=n_comp).astype(np.intp)
+    bad = np.flatnonzero(members + reactions != 2 * joints)
+    if bad.size:
+        c = bad[0]
+        raise TrussError(
+            f"Truss not statically determinate: a piece of {joints[c]} joints has "
+            f"m+r={members[c] + reactions[c]}, 2j={2 * joints[c]}"
+        )
+    bad = np.flatnonzero((joints > 1) & (reactions < 3))
+    if bad.size:
+        c = bad[0]
+        raise TrussError(f"Truss unstable: a piece of {joints[c]} joints has only {reactions[c]} reaction components (needs 3)")
+
+def factorize_truss(inp: schemas.SimulationInput, node_index: Dict[str, int] | None = None) -> TrussFactor:
+    """Validate the truss and return the (cached) factorization of its equilibrium matrix.
+
+    The factor depends only on geometry, connectivity and supports, so repeated
+    solves of the same truss (e.g. several load cases) skip assembly and LU.
+    """
     nodes = inp.nodes
     beams = inp.beams
-    loads = inp.loads
     n_nodes = len(nodes)
-    if n_nodes == 0:
-        return schemas.SimulationResult(displacements=[], internal_forces=[])
 
     # Map node id -> index
-    node_index = {n.id: i for i, n in enumerate(nodes)}
-
-    # Count reaction DOFs (translational only)
-    reaction_dofs: List[Tuple[int, str]] = []  # (node_index, 'x'/'y')
-    for i, n in enumerate(nodes):
-        if n.constraints:
-            if n.constraints.fix_x:
-                reaction_dofs.append((i, 'x'))
-            if n.constraints.fix_y:
-                reaction_dofs.append((i, 'y'))
+    if node_index is None:
+        node_index = {n.id: i for i, n in enumerate(nodes)}
 
     m = len(beams)
-    r = len(reaction_dofs)
     j = n_nodes
+
+    # Extract plain arrays once (one pass per model field); assembly and the
+    # factor cache work on these only. Supports are boolean masks per joint
+    # (translational only); reaction columns come from their nonzeros.
+    node_xy = np.fromiter((v for n in nodes for v in (n.x, n.y)), dtype=float, count=2 * j).reshape(j, 2)
+    constraints = [n.constraints for n in nodes]
+    fix_x = np.fromiter((c is not None and c.fix_x for c in constraints), dtype=bool, count=j)
+    fix_y = np.fromiter((c is not None and c.fix_y for c in constraints), dtype=bool, count=j)
+
+    r = int(np.count_nonzero(fix_x) + np.count_nonzero(fix_y))
     if m + r != 2 * j:
         # Not statically determinate (could be unstable or indeterminate)
         raise TrussError(f"Truss not statically determinate: m+r={m+r}, 2j={2*j}")
 
-    # Unknown order: all member axial forces (tension +) then reactions
-    n_unknowns = m + r
-    A = np.zeros((2 * j, n_unknowns), dtype=float)
-    b = np.zeros(2 * j, dtype=float)
-
-    # Precompute geometry
-    member_dirs: List[Tuple[float, float, float]] = []  # (c, s, L)
-    member_nodes: List[Tuple[int, int]] = []
-    for beam in beams:
-        if beam.node_start not in node_index or beam.node_end not in node_index:
-            raise TrussError(f"Beam {beam.id} references unknown node")
-        i = node_index[beam.node_start]
-        jn = node_index[beam.node_end]
-        n1 = nodes[i]
-        n2 = nodes[jn]
-        dx = n2.x - n1.x
-        dy = n2.y - n1.y
-        L = math.hypot(dx, dy)
-        if L <= 0:
-            raise TrussError("Zero-length member")
-        c = dx / L
-        s = dy / L
-        member_dirs.append((c, s, L))
-        member_nodes.append((i, jn))
-
-    # External loads per node (sum if multiple)
-    load_map = {n.id: (0.0, 0.0) for n in nodes}
-    for ld in loads:
-        if ld.node_id not in load_map:
-            raise TrussError(f"Load references unknown node {ld.node_id}")
-        px, py = load_map[ld.node_id]
-        load_map[ld.node_id] = (px + ld.Fx, py + ld.Fy)
-
-    # Assemble joint equilibrium rows
-    # Row indexing: node i => 2*i (Fx eq), 2*i+1 (Fy eq)
-    for member_idx, (i, jn) in enumerate(member_nodes):
-        c, s, _L = member_dirs[member_idx]
-        # Fx equilibrium contributions
-        A[2*i, member_idx] += c      # tension pulls away from i along +c
-        A[2*jn, member_idx] -= c     # opposite at j
-        # Fy equilibrium
-        A[2*i+1, member_idx] += s
-        A[2*jn+1, member_idx] -= s
-
-    # Reaction columns
-    for r_idx, (ni, axis) in enumerate(reaction_dofs):
-        col = m + r_idx
-        if axis == 'x':
-            A[2*ni, col] = 1.0
-        else:
-            A[2*ni+1, col] = 1.0
-
-    # RHS = -external loads
-    for ni, n in enumerate(nodes):
-        Fx, Fy = load_map[n.id]
-        b[2*ni] = -Fx
-        b[2*ni+1] = -Fy
-
     try:
-        x = np.linalg.solve(A, b)
-    except np.linalg.LinAlgError:
+        starts = np.fromiter((node_index[beam.node_start] for beam in beams), dtype=np.intp, count=m)
+        ends = np.fromiter((node_index[beam.node_end] for beam in beams), dtype=np.intp, count=m)
+    except KeyError:
+        bad = next(beam for beam in beams if beam.node_start not in node_index or beam.node_end not in node_index)
+        raise TrussError(f"Beam {bad.id} references unknown node") from None
+    _check_components(j, starts, ends, fix_x, fix_y)
+    return _factor_cached(node_xy.tobytes(), starts.tobytes(), ends.tobytes(), fix_x.tobytes(), fix_y.tobytes())
+
+def solve_loads(factor: TrussFactor, b: np.ndarray) -> np.ndarray:
+    """Solve for the unknowns (member forces then reactions) given the joint RHS.
+
+    ``b`` holds -external load per joint equation in node order: b[2*i] (Fx),
+    b[2*i+1] (Fy). Several load cases can be passed as columns of a 2-D ``b``.
+    """
+    b_rows = np.empty_like(b)
+    b_rows[factor.row_x] = b[0::2]
+    b_rows[factor.row_x + 1] = b[1::2]
+    x = factor.lu.solve(b_rows)[factor.col_of]
+    if not np.all(np.isfinite(x)):
         raise TrussError("Singular equilibrium system (unstable or indeterminate)")
+    return x
+
+def solve_truss(inp: schemas.SimulationInput) -> schemas.SimulationResult:
+    nodes = inp.nodes
+    beams = inp.beams
+    loads = inp.loads
+    n_nodes = len(nodes)
+    if n_nodes == 0:
+        return schemas.SimulationResult(displacements=[], internal_forces=[])
+
+    node_index = {n.id: i for i, n in enumerate(nodes)}
+    factor = factorize_truss(inp, node_index)
+    m = len(beams)
+
+    # RHS = -external loads (rows 2*i: Fx, 2*i+1: Fy): one pass over the loads
+    # into (joint, (Fx, Fy)) records, scattered straight into b (duplicates summed)
+    try:
+        load_rec = np.fromiter(
+            ((node_index[ld.node_id], (ld.Fx, ld.Fy)) for ld in loads),
+            dtype=[("node", np.intp), ("f", float, 2)], count=len(loads),
+        )
+    except KeyError as e:
+        raise TrussError(f"Load references unknown node {e.args[0]}") from None
+    b = np.zeros(2 * n_nodes, dtype=float)
+    np.subtract.at(b.reshape(n_nodes, 2), load_rec["node"], load_rec["f"])
 
+    x = solve_loads(factor, b)
     member_forces = x[:m]
     # reactions = x[m:]  # Not returned currently
 
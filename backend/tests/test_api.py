@@ -0,0 +1,183 @@
+"""Unittest-based tests for the FastAPI endpoints (via TestClient/httpx)."""
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+import scipy.sparse as sp
+from fastapi.testclient import TestClient
+
+from app import main
+from app.batching import SolveBatcher, solve_batch
+from app.main import app
+from app.simulation import DENSE_SOLVE_MAX_DOF, AssemblyError
+
+
+class TestMaterialsEndpoint(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+
+    def test_conditional_get_returns_304(self):
+        first = self.client.get("/materials")
+        self.assertEqual(first.status_code, 200)
+        self.assertTrue(first.json()["materials"])
+        etag = first.headers["etag"]
+
+        cached = self.client.get("/materials", headers={"If-None-Match": etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.content, b"")
+
+        stale = self.client.get("/materials", headers={"If-None-Match": 'W/"0"'})
+        self.assertEqual(stale.status_code, 200)
+        self.assertEqual(stale.json(), first.json())
+
+
+class TestSimulateEndpoint(unittest.TestCase):
+    def test_cantilever_tip_deflection(self):
+        E, I, L, P = 210e9, 1e-6, 1.0, 1000.0
+        payload = {
+            "nodes": [
+                {"id": "n1", "x": 0, "y": 0, "constraints": {"fix_x": True, "fix_y": True, "fix_rotation": True}},
+                {"id": "n2", "x": L, "y": 0},
+            ],
+            "beams": [{"id": "b1", "node_start": "n1", "node_end": "n2", "E": E, "I": I, "A": 1e-3}],
+            "loads": [{"node_id": "n2", "Fx": 0, "Fy": -P, "Moment": 0}],
+        }
+        with TestClient(app) as client:
+            res = client.post("/simulate", json=payload)
+        self.assertEqual(res.status_code, 200)
+        tip = next(d for d in res.json()["displacements"] if d["id"] == "n2")
+        self.assertAlmostEqual(tip["uy"], -P * L**3 / (3 * E * I), places=6)
+
+    def test_repeated_payload_served_from_cache(self):
+        payload = {
+            "nodes": [
+                {"id": "n1", "x": 0, "y": 0, "constraints": {"fix_x": True, "fix_y": True, "fix_rotation": True}},
+                {"id": "n2", "x": 2, "y": 0},
+            ],
+            "beams": [{"id": "b1", "node_start": "n1", "node_end": "n2", "E": 1e9, "I": 1e-6, "A": 1e-3}],
+            "loads": [{"node_id": "n2", "Fx": 5, "Fy": 0, "Moment": 0}],
+        }
+        client = TestClient(app)
+        with mock.patch.object(main, "_sim_cache", OrderedDict()):
+            first = client.post("/simulate", json=payload).json()
+            with mock.patch.object(main, "assemble_frame", side_effect=AssertionError("cache miss")):
+                self.assertEqual(client.post("/simulate", json=payload).json(), first)
+            payload["loads"][0]["Fx"] = 10
+            second = client.post("/simulate", json=payload).json()
+        self.assertAlmostEqual(second["displacements"][1]["ux"], 2 * first["displacements"][1]["ux"])
+
+    def test_invalid_payload_rejected_at_entry(self):
+        # Results skip validation (model_construct), so the input model is the guard
+        client = TestClient(app)
+        bad_beam = {"id": "b1", "node_start": "n1", "node_end": "n2", "E": "stiff", "I": 1, "A": 1}
+        res = client.post("/simulate", json={"nodes": [{"id": "n1", "x": 0, "y": 0}], "beams": [bad_beam]})
+        self.assertEqual(res.status_code, 422)
+        self.assertEqual(client.post("/simulate", json={"nodes": "n1"}).status_code, 422)
+
+    def test_batched_solves_isolate_singular_model(self):
+        good = (sp.csr_matrix(np.array([[2.0, 0.0], [0.0, 4.0]])), np.array([2.0, 8.0]))
+        singular = (sp.csr_matrix(np.array([[1.0, 1.0], [1.0, 1.0]])), np.array([1.0, 0.0]))
+        results = solve_batch([good, singular, good])
+        np.testing.assert_allclose(results[0], [1.0, 2.0])
+        self.assertIsInstance(results[1], AssemblyError)
+        np.testing.assert_allclose(results[2], [1.0, 2.0])
+        combined = solve_batch([good, good])
+        np.testing.assert_allclose(np.concatenate(combined), [1.0, 2.0, 1.0, 2.0])
+
+    def test_lone_large_solve_skips_batch_window(self):
+        n = DENSE_SOLVE_MAX_DOF + 1
+        K, F = sp.identity(n, format="csr") * 2.0, np.ones(n)
+        batcher = SolveBatcher(max_wait_ms=10_000)  # a waited window would hit the timeout below
+
+        async def lone():
+            return await asyncio.wait_for(batcher.solve(K, F), timeout=2.0)
+
+        async def concurrent():
+            batcher.max_wait = 0.01
+            try:
+                return await asyncio.gather(batcher.solve(K, F), batcher.solve(K, 2 * F))
+            finally:
+                await batcher.stop()
+
+        np.testing.assert_allclose(asyncio.run(lone()), 0.5)
+        first, second = asyncio.run(concurrent())
+        np.testing.assert_allclose(first, 0.5)
+        np.testing.assert_allclose(second, 1.0)
+
+
+class TestDesignEndpoints(unittest.TestCase):
+    def setUp(self):
+        self.client = TestClient(app)
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        for patcher in (
+            mock.patch.object(main, "DESIGNS_DIR", Path(tmp.name)),
+            mock.patch.object(main, "_design_index", None),
+        ):
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_save_list_load_roundtrip(self):
+        design = {
+            "nodes": [{"id": "n1", "x": 0.0, "y": 0.0}, {"id": "n2", "x": 1.0, "y": 0.0}],
+            "beams": [{"id": "b1", "node_start": "n1", "node_end": "n2", "E": 1.0, "I": 1.0, "A": 1.0}],
+            "supports": [["n1", "fixed"]],
+        }
+        self.assertEqual(self.client.get("/designs").json(), [])
+        saved = self.client.post("/designs/frame_a", json=design)
+        self.assertEqual(saved.status_code, 200)
+        self.assertEqual(saved.json()["name"], "frame_a")
+
+        listing = self.client.get("/designs").json()
+        self.assertEqual([d["name"] for d in listing], ["frame_a"])
+
+        loaded = self.client.get("/designs/frame_a").json()
+        self.assertEqual(loaded["unitSystem"], "IPS")
+        self.assertEqual([n["id"] for n in loaded["nodes"]], ["n1", "n2"])
+        self.assertEqual(loaded["supports"], [["n1", "fixed"]])
+
+    def test_listing_streams_newest_first(self):
+        with mock.patch.object(main, "DESIGN_LIST_CHUNK", 2):
+            self.assertEqual(self.client.get("/designs").json(), [])
+            for name in ("a", "b", "c"):
+                self.assertEqual(self.client.post(f"/designs/{name}", json={}).status_code, 200)
+                main._design_index[name] = {"a": 1.0, "b": 3.0, "c": 2.0}[name]
+            listing = self.client.get("/designs").json()
+        self.assertEqual([d["name"] for d in listing], ["b", "c", "a"])
+        self.assertEqual(listing[0]["modified"], 3.0)
+
+    def test_unknown_fields_not_persisted(self):
+        # Strictly valid payload (written as sent) and one needing coercion
+        # (written from model_dump) store the same fields
+        for name, grid in (("strict", 1.0), ("lax", "1.0")):
+            res = self.client.post(f"/designs/{name}", json={"gridSpacing": grid, "secret_extra": 1})
+            self.assertEqual(res.status_code, 200)
+            stored = json.loads((main.DESIGNS_DIR / f"{name}.json").read_text())
+            self.assertNotIn("secret_extra", stored)
+            self.assertEqual(stored["gridSpacing"], 1.0)
+
+    def test_concurrent_saves_of_one_design(self):
+        designs = [{"nodes": [{"id": f"n{k}", "x": float(k), "y": 0.0}] * 200} for k in range(8)]
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            codes = list(pool.map(lambda d: self.client.post("/designs/shared", json=d).status_code, designs))
+        self.assertEqual(codes, [200] * len(designs))
+        self.assertEqual(os.listdir(main.DESIGNS_DIR), ["shared.json"])
+        # One writer's design, whole: 200 copies of a single node
+        nodes = self.client.get("/designs/shared").json()["nodes"]
+        self.assertEqual(len(nodes), 200)
+        self.assertEqual(len({n["id"] for n in nodes}), 1)
+
+    def test_invalid_name_rejected(self):
+        self.assertEqual(self.client.post("/designs/bad.name", json={}).status_code, 400)
+        self.assertEqual(self.client.get("/designs/missing").status_code, 404)
+
+
+if __name__ == "__main__":  # pragma: no cover
+    unittest.main()
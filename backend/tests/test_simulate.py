@@ -7,9 +7,11 @@ With downward load (negative Fy) we expect negative deflection and rotation sign
 """
 import unittest
 
+import numpy as np
+
 from app import schemas
 from app.simulation import simulate_structure, AssemblyError
-from app.truss_solver import solve_truss, TrussError
+from app.truss_solver import factorize_truss, solve_loads, solve_truss, TrussError
 
 
 class TestSimulation(unittest.TestCase):
@@ -32,12 +34,14 @@ class TestSimulation(unittest.TestCase):
         ]
 
         result = simulate_structure(schemas.SimulationInput(nodes=nodes, beams=beams, loads=loads))
-        n2 = next(d for d in result.displacements if d.id == "n2")
+        disp = {d.id: d for d in result.displacements}
+        forces = {f.id: f for f in result.internal_forces}
+        n2 = disp["n2"]
         v_expected = P * L**3 / (3 * E * I)
         theta_expected = P * L**2 / (2 * E * I)
         self.assertAlmostEqual(v_expected, n2.uy, delta=abs(v_expected)*1e-3)
         self.assertAlmostEqual(theta_expected, n2.rotation, delta=abs(theta_expected)*1e-3)
-        b1 = next(b for b in result.internal_forces if b.id == "b1")
+        b1 = forces["b1"]
         self.assertLess(abs(b1.axial), 1e-3)
 
     def test_unstable_structure_raises(self):
@@ -53,6 +57,19 @@ class TestSimulation(unittest.TestCase):
         with self.assertRaises(AssemblyError):
             simulate_structure(schemas.SimulationInput(nodes=nodes, beams=beams, loads=loads))
 
+    def test_slender_cantilever_not_reported_singular(self):
+        # Axial stiffness far above bending stiffness (EA/L ~ 4e9, 12EI/L^3 ~ 0.02) is still stable
+        E, A, I, Le, n = 2e11, 1e-2, 1e-12, 0.5, 90
+        P = -1.0
+        fixed = schemas.NodeConstraint(fix_x=True, fix_y=True, fix_rotation=True)
+        nodes = [schemas.NodeInput(id=f"n{k}", x=k*Le, y=0.0, constraints=fixed if k == 0 else None) for k in range(n + 1)]
+        beams = [schemas.BeamInput(id=f"b{k}", node_start=f"n{k}", node_end=f"n{k+1}", E=E, I=I, A=A) for k in range(n)]
+        loads = [schemas.LoadInput(node_id=f"n{n}", Fy=P)]
+        result = simulate_structure(schemas.SimulationInput(nodes=nodes, beams=beams, loads=loads))
+        tip = {d.id: d for d in result.displacements}[f"n{n}"]
+        v_expected = P * (n*Le)**3 / (3 * E * I)
+        self.assertAlmostEqual(v_expected, tip.uy, delta=abs(v_expected)*1e-6)
+
     def test_axial_tension_force(self):
         # Simple two-node bar in pure tension
         E = 200e9
@@ -67,7 +84,8 @@ class TestSimulation(unittest.TestCase):
         beams = [schemas.BeamInput(id="bar", node_start="n1", node_end="n2", E=E, I=I, A=A)]
         loads = [schemas.LoadInput(node_id="n2", Fx=P, Fy=0.0, Moment=0.0)]
         result = simulate_structure(schemas.SimulationInput(nodes=nodes, beams=beams, loads=loads))
-        bar_force = next(b for b in result.internal_forces if b.id == "bar").axial
+        forces = {f.id: f.axial for f in result.internal_forces}
+        bar_force = forces["bar"]
         # Expected axial elongation force equals applied load (equilibrium) within small tolerance
         self.assertAlmostEqual(bar_force, P, delta=abs(P)*1e-3)
         self.assertGreater(bar_force, 0.0)  # tension positive
@@ -98,6 +116,50 @@ class TestSimulation(unittest.TestCase):
         self.assertGreater(forces['BC'], 0.0)
         self.assertGreater(forces['AB'], 0.0)
 
+    def test_truss_factor_reused_across_load_cases(self):
+        # Same triangle; two load cases solved against one cached factorization
+        nodes = [
+            schemas.NodeInput(id="A", x=0.0, y=0.0, constraints=schemas.NodeConstraint(fix_x=True, fix_y=True)),
+            schemas.NodeInput(id="B", x=4.0, y=0.0, constraints=schemas.NodeConstraint(fix_y=True)),
+            schemas.NodeInput(id="C", x=2.0, y=3.0),
+        ]
+        beams = [
+            schemas.BeamInput(id=bid, node_start=s, node_end=e, E=1.0, I=1.0, A=1.0)
+            for bid, s, e in (("AB", "A", "B"), ("AC", "A", "C"), ("BC", "B", "C"))
+        ]
+        inp = schemas.SimulationInput(nodes=nodes, beams=beams, analysis_type='truss')
+        factor = factorize_truss(inp)
+        self.assertIs(factorize_truss(inp.model_copy(deep=True)), factor)
+
+        cases = ((0.0, 100.0), (-1000.0, 200.0))
+        b = np.zeros((6, len(cases)))  # one column per load case, -load at joint C (index 2)
+        for case, (fx, fy) in enumerate(cases):
+            b[4, case], b[5, case] = -fx, -fy
+        x = solve_loads(factor, b)
+        for case, (fx, fy) in enumerate(cases):
+            loads = [schemas.LoadInput(node_id="C", Fx=fx, Fy=fy)]
+            single = solve_truss(inp.model_copy(update={"loads": loads}))
+            for k, f in enumerate(single.internal_forces):
+                self.assertAlmostEqual(x[k, case], f.axial, places=9)
+
+    def test_truss_disconnected_pieces_rejected_before_assembly(self):
+        # m+r == 2j overall, but the pinned bar is over-supported and the free bar has no supports
+        pin = schemas.NodeConstraint(fix_x=True, fix_y=True)
+        nodes = [
+            schemas.NodeInput(id="A", x=0.0, y=0.0, constraints=pin),
+            schemas.NodeInput(id="B", x=1.0, y=0.0, constraints=pin),
+            schemas.NodeInput(id="C", x=0.0, y=2.0),
+            schemas.NodeInput(id="D", x=1.0, y=2.0),
+        ]
+        beams = [
+            schemas.BeamInput(id="AB", node_start="A", node_end="B", E=1.0, I=1.0, A=1.0),
+            schemas.BeamInput(id="CD", node_start="C", node_end="D", E=1.0, I=1.0, A=1.0),
+        ]
+        beams += [schemas.BeamInput(id=f"CD{k}", node_start="C", node_end="D", E=1.0, I=1.0, A=1.0) for k in range(2)]
+        inp = schemas.SimulationInput(nodes=nodes, beams=beams, analysis_type='truss')
+        with self.assertRaisesRegex(TrussError, "not statically determinate"):
+            solve_truss(inp)
+
 
 if __name__ == "__main__":  # pragma: no cover
     unittest.main()
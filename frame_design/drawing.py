@@ -5,6 +5,9 @@ Handles rendering nodes, beams, fixtures, masses, and grid to the canvas.
 
 import dearpygui.dearpygui as dpg
 import math
+from collections import defaultdict
+from functools import lru_cache
+import numpy as np
 
 # Configuration
 CANVAS_WIDTH = 1000
@@ -18,19 +21,61 @@ BEAM_HOVER_COLOR = (255, 255, 255, 255)  # White for beam preview
 FIXTURE_COLOR = (255, 128, 0, 255)  # RED
 MASS_COLOR = (255, 0, 0, 255)  # Red
 
+# Canvas draw layers (bottom to top). The grid is redrawn only when the scale
+# changes, each model part (beams, nodes, fixtures, masses) only when the model
+# marks it dirty, and the preview layer's single rubber-band line is moved (not
+# recreated) on every mouse move.
+GRID_LAYER = "grid_layer"
+BEAMS_LAYER = "beams_layer"
+NODES_LAYER = "nodes_layer"
+FIXTURES_LAYER = "fixtures_layer"
+MASSES_LAYER = "masses_layer"
+PREVIEW_LAYER = "preview_layer"
+CANVAS_LAYERS = (GRID_LAYER, BEAMS_LAYER, NODES_LAYER, FIXTURES_LAYER, MASSES_LAYER, PREVIEW_LAYER)
+_grid_scale_drawn = None  # scale factor the grid layer currently shows
+_beams_scale_drawn = None  # scale factor the beams layer was drawn with (sets thickness)
+
+def _ensure_layers():
+    """Create the canvas draw layers once, in stacking order."""
+    canvas = dpg.get_alias_id("canvas")
+    for tag in CANVAS_LAYERS:
+        if not dpg.does_item_exist(tag):
+            dpg.add_draw_layer(parent=canvas, tag=tag)
+
+@lru_cache(maxsize=4)
+def _grid_polylines(width, height, spacing):
+    """Grid lines as two serpentine polylines (vertical, horizontal).
+
+    Consecutive lines are joined along the canvas edges (y=0/height and
+    x=0/width), so each axis is a single draw item.
+    """
+    v_points = []
+    for k, x in enumerate(range(0, width, spacing)):
+        ends = [(x, 0), (x, height)]
+        v_points += ends if k % 2 == 0 else ends[::-1]
+    h_points = []
+    for k, y in enumerate(range(0, height, spacing)):
+        ends = [(0, y), (width, y)]
+        h_points += ends if k % 2 == 0 else ends[::-1]
+    return v_points, h_points
+
 def draw_grid(scale_factor=1.0):
     """Draw a grid on the canvas with a scale indicator."""
+    global _grid_scale_drawn
+    _ensure_layers()
+    dpg.delete_item(GRID_LAYER, children_only=True)
+    _grid_scale_drawn = scale_factor
+    # Resolve the layer tag once instead of on every draw call
+    layer = dpg.get_alias_id(GRID_LAYER)
+
     # Get the size of the drawing area
     width = CANVAS_WIDTH
     height = CANVAS_HEIGHT
     
-    # Draw vertical grid lines
-    for x in range(0, width, GRID_SPACING):
-        dpg.draw_line((x, 0), (x, height), color=GRID_COLOR, parent="canvas")
-    
-    # Draw horizontal grid lines
-    for y in range(0, height, GRID_SPACING):
-        dpg.draw_line((0, y), (width, y), color=GRID_COLOR, parent="canvas")
+    # Draw vertical and horizontal grid lines, one polyline per axis
+    v_points, h_points = _grid_polylines(width, height, GRID_SPACING)
+    dpg.draw_polyline(v_points, color=GRID_COLOR, parent=layer)
+    dpg.draw_polyline(h_points, color=GRID_COLOR, parent=layer)
     
     # Draw scale indicator in the bottom left
     scale_start_x = 20
@@ -43,19 +88,21 @@ def draw_grid(scale_factor=1.0):
         (scale_start_x + scale_width, scale_start_y),
         color=(255, 255, 255),
         thickness=2,
-        parent="canvas"
+        parent=layer
     )
     
-    # Draw tick marks
-    for i in range(6):  # 0 to 5 ticks
+    # Draw tick marks (0 to 5) as one polyline; the runs between ticks retrace the bar
+    tick_points = []
+    for i in range(6):
         tick_x = scale_start_x + (i * GRID_SPACING)
-        dpg.draw_line(
-            (tick_x, scale_start_y - 3),
-            (tick_x, scale_start_y + 3),
-            color=(255, 255, 255),
-            thickness=1,
-            parent="canvas"
-        )
+        tick_points += [(tick_x, scale_start_y), (tick_x, scale_start_y - 3),
+                        (tick_x, scale_start_y + 3), (tick_x, scale_start_y)]
+    dpg.draw_polyline(
+        tick_points,
+        color=(255, 255, 255),
+        thickness=1,
+        parent=layer
+    )
     
     # Draw scale label
     physical_length = 5 * scale_factor  # 5 grid spaces in real-world units
@@ -63,7 +110,7 @@ def draw_grid(scale_factor=1.0):
         (scale_start_x + scale_width/2 - 20, scale_start_y - 20),
         f"Scale: {physical_length} units",
         color=(255, 255, 0),
-        parent="canvas"
+        parent=layer
     )
     
     # Draw grid info text
@@ -73,131 +120,275 @@ def draw_grid(scale_factor=1.0):
         (grid_info_x, grid_info_y),
         f"Grid: {GRID_SPACING}px = {scale_factor} units",
         color=(200, 200, 200),
-        parent="canvas"
+        parent=layer
     )
 
+def _visible(pos, margin=0):
+    """True if pos (or a glyph of radius margin around it) falls on the canvas."""
+    return -margin <= pos[0] <= CANVAS_WIDTH + margin and -margin <= pos[1] <= CANVAS_HEIGHT + margin
+
+def _visible_mask(points, margin=0):
+    """_visible for an (N, 2) array of points, as a boolean mask."""
+    x, y = points[:, 0], points[:, 1]
+    return (x >= -margin) & (x <= CANVAS_WIDTH + margin) & (y >= -margin) & (y <= CANVAS_HEIGHT + margin)
+
+def _segment_offscreen(p, q):
+    """True if both endpoints lie beyond the same canvas edge (trivial reject)."""
+    return ((p[0] < 0 and q[0] < 0) or (p[0] > CANVAS_WIDTH and q[0] > CANVAS_WIDTH)
+            or (p[1] < 0 and q[1] < 0) or (p[1] > CANVAS_HEIGHT and q[1] > CANVAS_HEIGHT))
+
+NODE_LABEL_LIMIT = 200  # above this many nodes the N<i> labels are skipped
+_node_labels = []  # "N<i>" strings, grown on demand and shared by every redraw
+
 def draw_nodes(model):
-    """Draw all nodes on the canvas."""
-    for i, node in enumerate(model.nodes):
-        x, y = node["pos"]
-        color = SELECTED_NODE_COLOR if node.get("selected", False) else NODE_COLOR
-        dpg.draw_circle((x, y), 5, color=color, fill=color, parent="canvas")
-        dpg.draw_text((x + 10, y), f"N{i}", color=(255, 255, 255, 255), parent="canvas")
-
-def _draw_half_circle(center, radius, facing_angle_rad, color, parent):
-    """Draw a filled half-circle centered at node, facing along beam (facing_angle_rad)."""
+    """Draw all nodes on the canvas (selected ones last, on top)."""
+    nodes = model.nodes
+    n_nodes = len(nodes)
+    if len(_node_labels) < n_nodes:
+        _node_labels.extend(f"N{i}" for i in range(len(_node_labels), n_nodes))
+    show_labels = n_nodes <= NODE_LABEL_LIMIT
+    # Cull off-canvas nodes in one array pass; only visible ones are iterated
+    on_canvas = np.flatnonzero(_visible_mask(model.node_positions(), 5)).tolist()
+    selected = [i for i in on_canvas if nodes[i]["selected"]]
+    unselected = [i for i in on_canvas if not nodes[i]["selected"]] if selected else on_canvas
+
+    draw_circle, draw_text, layer = dpg.draw_circle, dpg.draw_text, NODES_LAYER
+    for indices, color in ((unselected, NODE_COLOR), (selected, SELECTED_NODE_COLOR)):
+        for i in indices:
+            x, y = pos = nodes[i]["pos"]
+            draw_circle(pos, 5, color=color, fill=color, parent=layer)
+            if show_labels:
+                draw_text((x + 10, y), _node_labels[i], color=(255, 255, 255, 255), parent=layer)
+
+# Unit half-circle arc spanning +/- 90 degrees around +x (16 segments); caps
+# rotate and scale this template instead of re-evaluating cos/sin per vertex
+_HALF_CIRCLE_SEGMENTS = 16
+_UNIT_HALF_CIRCLE = np.column_stack((
+    np.cos(np.linspace(-math.pi/2, math.pi/2, _HALF_CIRCLE_SEGMENTS + 1)),
+    np.sin(np.linspace(-math.pi/2, math.pi/2, _HALF_CIRCLE_SEGMENTS + 1)),
+))
+
+def _half_circle_points(center, radius, c, s):
+    """Vertices of a filled half-circle fan centered at node, facing along unit direction (c, s)."""
     # Half circle spans +/- 90 degrees around facing direction (opposite for making a 'cap').
-    start_angle = facing_angle_rad - math.pi/2
-    end_angle = facing_angle_rad + math.pi/2
-    segments = 16
-    pts = []
-    for i in range(segments + 1):
-        t = start_angle + (end_angle - start_angle) * (i / segments)
-        pts.append((center[0] + radius * math.cos(t), center[1] + radius * math.sin(t)))
+    rot = np.array([[c, -s], [s, c]])
+    pts = (np.asarray(center, dtype=float) + radius * (_UNIT_HALF_CIRCLE @ rot.T)).tolist()
     # Close with center to make a filled fan
     pts.append(center)
-    dpg.draw_polygon(pts, color=color, fill=(color[0], color[1], color[2], 60), parent=parent)
+    return pts
+
+_beam_geometry_cache = None  # (model, (beams, mids, angles)) of the last _beam_geometry call
 
-def draw_beams(model, mouse_pos=None, scale_factor=1.0):
+def _beam_geometry(model):
+    """Drawable beams with their midpoints and angles, computed in one NumPy pass.
+
+    Reused for the same model until its beams are marked dirty again
+    (node deletion marks every part).
+    """
+    global _beam_geometry_cache
+    if ("beams" not in model.dirty_parts and _beam_geometry_cache is not None
+            and _beam_geometry_cache[0] is model):
+        return _beam_geometry_cache[1]
+    positions = model.node_positions()
+    beam_nodes = model.beam_nodes()
+    keep = np.flatnonzero(((beam_nodes >= 0) & (beam_nodes < len(positions))).all(axis=1))
+    beams = [(i, model.beams[i]) for i in keep.tolist()]
+    starts = positions[beam_nodes[keep, 0]]
+    ends = positions[beam_nodes[keep, 1]]
+    mids = (starts + ends) * 0.5
+    d = ends - starts
+    angles = np.arctan2(d[:, 1], d[:, 0])
+    geometry = (beams, [tuple(m) for m in mids.tolist()], angles.tolist())
+    _beam_geometry_cache = (model, geometry)
+    return geometry
+
+def _edge_trails(edges):
+    """Split edges (node index pairs) into trails that walk each edge once.
+
+    Each trail is a node index sequence drawable as one polyline. Walks start
+    from odd-degree nodes first so chains are not broken up needlessly.
+    """
+    adj = defaultdict(list)
+    for e, (a, b) in enumerate(edges):
+        adj[a].append((b, e))
+        adj[b].append((a, e))
+    used = [False] * len(edges)
+    trails = []
+    for start in sorted(adj, key=lambda n: len(adj[n]) % 2 == 0):
+        while adj[start]:
+            trail = [start]
+            node = start
+            while adj[node]:
+                nxt, e = adj[node].pop()
+                if used[e]:
+                    continue
+                used[e] = True
+                trail.append(nxt)
+                node = nxt
+            if len(trail) > 1:
+                trails.append(trail)
+    return trails
+
+def _beam_style(i, beam, section, pixel_per_unit, start_pos, end_pos, angle,
+                _cos=math.cos, _sin=math.sin):
+    """(thickness, label, start cap points, end cap points) of one beam."""
+    thickness_scale = 0.5  # Visual scaling factor to avoid huge strokes
+    label = f"B{i}"
+    if section:
+        if section.get("shape") == "round_tube":
+            od = section.get("outer_diameter_in", 1.0)
+            # Short descriptor
+            label += f" {section.get('outer_diameter_in', 0):.2f}x{section.get('wall_thickness_in',0):.3f}"
+        elif section.get("shape") == "square_tube":
+            od = section.get("outer_width_in", 1.0)
+            label += f" {section.get('outer_width_in', 0):.2f}sq"
+        else:
+            od = 1.0
+        thickness = max(2, od * pixel_per_unit * thickness_scale)
+        # Half-circle caps: start cap facing backwards (angle + pi), end cap
+        # forwards; one cos/sin pair serves both
+        c, s = _cos(angle), _sin(angle)
+        caps = (_half_circle_points(start_pos, thickness/2, -c, -s),
+                _half_circle_points(end_pos, thickness/2, c, s))
+    else:
+        thickness = 2
+        caps = (None, None)
+    return (thickness, label) + caps
+
+# Per-beam styles for one model: (model, {beam index: (beam, section, key, style)})
+_beam_style_cache = (None, {})
+
+def draw_beams(model, scale_factor=1.0):
     """Draw all beams with thickness based on assigned section (if any)."""
     pixel_per_unit = GRID_SPACING / max(scale_factor, 1e-6)
-    thickness_scale = 0.5  # Visual scaling factor to avoid huge strokes
 
-    for i, beam in enumerate(model.beams):
-        if "start" in beam and "end" in beam and beam["start"] < len(model.nodes) and beam["end"] < len(model.nodes):
-            start_pos = model.nodes[beam["start"]]["pos"]
-            end_pos = model.nodes[beam["end"]]["pos"]
-
-            section = beam.get("section")
-            if section:
-                if section.get("shape") == "round_tube":
-                    od = section.get("outer_diameter_in", 1.0)
-                elif section.get("shape") == "square_tube":
-                    od = section.get("outer_width_in", 1.0)
-                else:
-                    od = 1.0
-                thickness = max(2, od * pixel_per_unit * thickness_scale)
-            else:
-                thickness = 2
-
-            # Draw thick beam line
-            dpg.draw_line(start_pos, end_pos, color=BEAM_COLOR, thickness=thickness, parent="canvas")
-
-            # Half-circle caps at ends if section present
-            if section:
-                dx = end_pos[0] - start_pos[0]
-                dy = end_pos[1] - start_pos[1]
-                angle = math.atan2(dy, dx)
-                # Start cap facing backwards (angle + pi)
-                _draw_half_circle(start_pos, thickness/2, angle + math.pi, BEAM_COLOR, "canvas")
-                # End cap facing forwards (angle)
-                _draw_half_circle(end_pos, thickness/2, angle, BEAM_COLOR, "canvas")
-
-            # Midpoint label & small marker (above large line if thick)
-            mid_x = (start_pos[0] + end_pos[0]) / 2
-            mid_y = (start_pos[1] + end_pos[1]) / 2
-            dpg.draw_circle((mid_x, mid_y), 3, color=BEAM_COLOR, fill=BEAM_COLOR, parent="canvas")
-
-            label = f"B{i}"
-            if section:
-                # Short descriptor
-                if section.get("shape") == "round_tube":
-                    label += f" {section.get('outer_diameter_in', 0):.2f}x{section.get('wall_thickness_in',0):.3f}"
-                elif section.get("shape") == "square_tube":
-                    label += f" {section.get('outer_width_in', 0):.2f}sq"
-            dpg.draw_text((mid_x + 5, mid_y - 10), label, color=(255,255,255,255), parent="canvas")
-
-    # Preview line
+    beams, mids, angles = _beam_geometry(model)
+    nodes = model.nodes
+    draw_circle, draw_text, draw_polygon, draw_line = dpg.draw_circle, dpg.draw_text, dpg.draw_polygon, dpg.draw_line
+    color, layer = BEAM_COLOR, BEAMS_LAYER
+    cap_fill = (color[0], color[1], color[2], 60)
+    # Per-beam styles survive redraws (e.g. adding one beam) and are recomputed
+    # only when the beam's section object, endpoints or the scale change
+    global _beam_style_cache
+    if _beam_style_cache[0] is not model:
+        _beam_style_cache = (model, {})
+    cache = _beam_style_cache[1]
+    for stale in [k for k in cache if k >= len(model.beams)]:
+        del cache[stale]
+    visible = []  # (style, mid) of beams on the canvas
+    plain_edges = []  # (start, end) node pairs of unsectioned (2 px) beams
+    section_lines = []  # (start_pos, end_pos, thickness) of sectioned beams
+    for (i, beam), mid, angle in zip(beams, mids, angles):
+        start_pos = nodes[beam["start"]]["pos"]
+        end_pos = nodes[beam["end"]]["pos"]
+        # Skip beams entirely off one side of the canvas
+        if _segment_offscreen(start_pos, end_pos):
+            continue
+
+        section = beam.get("section")
+        key = (pixel_per_unit, start_pos, end_pos)
+        entry = cache.get(i)
+        if entry is None or entry[0] is not beam or entry[1] is not section or entry[2] != key:
+            entry = cache[i] = (beam, section, key,
+                                _beam_style(i, beam, section, pixel_per_unit, start_pos, end_pos, angle))
+        style = entry[3]
+        if style[2] is None:
+            plain_edges.append((beam["start"], beam["end"]))
+        else:
+            section_lines.append((start_pos, end_pos, style[0]))
+        visible.append((style, mid))
+
+    # Thin unsectioned beams: one polyline per connected trail (joins are
+    # negligible at 2 px)
+    for trail in _edge_trails(plain_edges):
+        dpg.draw_polyline([nodes[k]["pos"] for k in trail], color=color, thickness=2, parent=layer)
+    # Sectioned beams stay separate lines at the caps' exact thickness: mitered
+    # polyline joins would spike past the node at acute frame angles
+    for start_pos, end_pos, thickness in section_lines:
+        draw_line(start_pos, end_pos, color=color, thickness=thickness, parent=layer)
+
+    for (thickness, label, start_cap, end_cap), (mid_x, mid_y) in visible:
+        # Half-circle caps at ends if section present
+        if start_cap is not None:
+            draw_polygon(start_cap, color=color, fill=cap_fill, parent=layer)
+            draw_polygon(end_cap, color=color, fill=cap_fill, parent=layer)
+
+        # Midpoint label & small marker (above large line if thick)
+        if not _visible((mid_x, mid_y), 3):
+            continue
+        draw_circle((mid_x, mid_y), 3, color=color, fill=color, parent=layer)
+        draw_text((mid_x + 5, mid_y - 10), label, color=(255,255,255,255), parent=layer)
+
+PREVIEW_LINE = "beam_preview"  # the one rubber-band line item, reused across mouse moves
+
+def draw_beam_preview(model, mouse_pos):
+    """Show the rubber-band line from the selected node to the mouse, or hide it.
+
+    mouse_pos is an (x, y) tuple or None. Called directly from the mouse-move
+    handlers; the line item (created with the UI) is only reconfigured.
+    """
     if mouse_pos is not None and model.selected_node is not None and model.selected_node < len(model.nodes):
-        try:
-            start_pos = model.nodes[model.selected_node]["pos"]
-            if isinstance(mouse_pos, tuple) and len(mouse_pos) == 2:
-                dpg.draw_line(start_pos, mouse_pos, color=BEAM_HOVER_COLOR, thickness=1, style=2, parent="canvas")
-        except Exception as e:
-            print(f"Error drawing beam preview: {e}")
+        start_pos = model.nodes[model.selected_node]["pos"]
+        if dpg.does_item_exist(PREVIEW_LINE):
+            dpg.configure_item(PREVIEW_LINE, p1=start_pos, p2=mouse_pos, show=True)
+        else:
+            dpg.draw_line(start_pos, mouse_pos, color=BEAM_HOVER_COLOR, thickness=1, style=2,
+                          parent=PREVIEW_LAYER, tag=PREVIEW_LINE)
+    elif dpg.does_item_exist(PREVIEW_LINE):
+        dpg.configure_item(PREVIEW_LINE, show=False)
+
+# Fixture dimensions (in pixels) - easily adjustable
+FIXTURE_DIMENSIONS = {
+    "box_size": 14,           # Size of square around node
+    "support_line_width": 22, # Width of horizontal support line
+    "strut_length": 12,        # Length of diagonal strut lines 
+    "strut_angle": 10,        # Angle of diagonal struts (degrees)
+    "strut_count": 9,         # Number of strut lines to draw
+    "strut_spacing": 2        # Spacing between strut lines
+}
+
+# Fixture geometry derived from FIXTURE_DIMENSIONS once at import
+_FD_HALF_SIZE = FIXTURE_DIMENSIONS["box_size"] / 2
+_FD_SUPPORT_HW = FIXTURE_DIMENSIONS["support_line_width"] / 2
+_FD_DX = math.sin(math.radians(FIXTURE_DIMENSIONS["strut_angle"])) * FIXTURE_DIMENSIONS["strut_length"]
+_FD_DY = math.cos(math.radians(FIXTURE_DIMENSIONS["strut_angle"])) * FIXTURE_DIMENSIONS["strut_length"]
+_FD_HALF_COUNT = FIXTURE_DIMENSIONS["strut_count"] // 2
+_FD_SPACING = FIXTURE_DIMENSIONS["strut_spacing"]
 
 def draw_fixtures(model):
     """Draw all fixtures on the canvas with engineering-style supports."""
-    # Fixture dimensions (in pixels) - easily adjustable
-    FIXTURE_DIMENSIONS = {
-        "box_size": 14,           # Size of square around node
-        "support_line_width": 22, # Width of horizontal support line
-        "strut_length": 12,        # Length of diagonal strut lines 
-        "strut_angle": 10,        # Angle of diagonal struts (degrees)
-        "strut_count": 9,         # Number of strut lines to draw
-        "strut_spacing": 2        # Spacing between strut lines
-    }
-    
-    import math
-    
+    half_size = _FD_HALF_SIZE
+    support_half_width = _FD_SUPPORT_HW
+    dx, dy = _FD_DX, _FD_DY
+    half_count = _FD_HALF_COUNT
+    spacing = _FD_SPACING
+
+    nodes = model.nodes
+    n_nodes = len(nodes)
+    draw_line, color, layer = dpg.draw_line, FIXTURE_COLOR, FIXTURES_LAYER
+    # Reach of the fixture glyph below / beside its node, for culling
+    margin = half_size + 2 + dy + max(support_half_width, half_count * spacing + dx)
     for fixture in model.fixtures:
-        if fixture["node"] < len(model.nodes):
-            node_pos = model.nodes[fixture["node"]]["pos"]
-            x, y = node_pos
+        if fixture["node"] < n_nodes:
+            x, y = nodes[fixture["node"]]["pos"]
+            if not _visible((x, y), margin):
+                continue
             
             # 1. Draw square around node
-            half_size = FIXTURE_DIMENSIONS["box_size"] / 2
             box_min = (x - half_size, y - half_size)
             box_max = (x + half_size, y + half_size)
-            dpg.draw_rectangle(box_min, box_max, color=FIXTURE_COLOR, thickness=2, parent="canvas")
+            dpg.draw_rectangle(box_min, box_max, color=color, thickness=2, parent=layer)
             
             # 2. Draw horizontal support line at bottom
-            support_half_width = FIXTURE_DIMENSIONS["support_line_width"] / 2
             support_y = y + half_size + 2  # Just below the square
             support_start = (x - support_half_width, support_y)
             support_end = (x + support_half_width, support_y)
-            dpg.draw_line(support_start, support_end, color=FIXTURE_COLOR, thickness=2, parent="canvas")
-            
-            # 3. Draw diagonal strut lines
-            strut_length = FIXTURE_DIMENSIONS["strut_length"]
-            angle_rad = math.radians(FIXTURE_DIMENSIONS["strut_angle"])
-            dx = math.sin(angle_rad) * strut_length
-            dy = math.cos(angle_rad) * strut_length
-            
-            half_count = FIXTURE_DIMENSIONS["strut_count"] // 2
-            spacing = FIXTURE_DIMENSIONS["strut_spacing"]
+            draw_line(support_start, support_end, color=color, thickness=2, parent=layer)
             
-            # Draw struts centered on the support line
+            # 3. Draw diagonal strut lines, centered on the support line, as one
+            # polyline: out along each strut and back (runs between struts
+            # retrace the support line)
+            strut_points = []
             for i in range(-half_count, half_count + 1):
                 strut_x = x + (i * spacing)
                 strut_start = (strut_x, support_y)
@@ -210,27 +401,52 @@ def draw_fixtures(model):
                     # Strut going down-left
                     strut_end = (strut_x - dx, support_y + dy)
                 
-                dpg.draw_line(strut_start, strut_end, color=FIXTURE_COLOR, thickness=1, parent="canvas")
+                strut_points += (strut_start, strut_end, strut_start)
+            dpg.draw_polyline(strut_points, color=color, thickness=1, parent=layer)
 
 def draw_masses(model):
     """Draw all masses on the canvas."""
+    nodes = model.nodes
+    n_nodes = len(nodes)
+    layer = MASSES_LAYER
     for mass in model.masses:
-        if mass["node"] < len(model.nodes):
-            node_pos = model.nodes[mass["node"]]["pos"]
-            dpg.draw_circle(node_pos, 12, color=MASS_COLOR, thickness=2, parent="canvas")
+        if mass["node"] < n_nodes:
+            node_pos = nodes[mass["node"]]["pos"]
+            if not _visible(node_pos, 12):
+                continue
+            dpg.draw_circle(node_pos, 12, color=MASS_COLOR, thickness=2, parent=layer)
             dpg.draw_text((node_pos[0] + 10, node_pos[1] + 10), 
-                         f"{mass['value']}kg", color=(255, 255, 255, 255), parent="canvas")
+                         f"{mass['value']}kg", color=(255, 255, 255, 255), parent=layer)
+
+def draw_model_layers(model, scale_factor=1.0):
+    """Redraw the layers of the model parts marked dirty, then clear the marks.
+
+    Beam thickness depends on the scale, so a scale change also redraws beams.
+    """
+    global _beams_scale_drawn
+    parts = set(model.dirty_parts)
+    if scale_factor != _beams_scale_drawn:
+        parts.add("beams")
+    for part, layer, draw in (("beams", BEAMS_LAYER, lambda: draw_beams(model, scale_factor)),
+                              ("nodes", NODES_LAYER, lambda: draw_nodes(model)),
+                              ("fixtures", FIXTURES_LAYER, lambda: draw_fixtures(model)),
+                              ("masses", MASSES_LAYER, lambda: draw_masses(model))):
+        if part in parts:
+            dpg.delete_item(layer, children_only=True)
+            draw()
+    model.dirty = False
+    _beams_scale_drawn = scale_factor
 
 def draw_everything(model, mouse_pos=None, scale_factor=1.0):
-    """Clear canvas and redraw all elements."""
+    """Refresh the canvas, redrawing only the layers whose inputs changed."""
+    if not (isinstance(mouse_pos, tuple) and len(mouse_pos) == 2):
+        mouse_pos = None  # no preview for missing / malformed positions
     try:
-        dpg.delete_item("canvas", children_only=True)
-        
-        # Redraw everything
-        draw_grid(scale_factor)
-        draw_beams(model, mouse_pos, scale_factor)
-        draw_nodes(model)
-        draw_fixtures(model)
-        draw_masses(model)
+        _ensure_layers()
+        if scale_factor != _grid_scale_drawn:
+            draw_grid(scale_factor)
+        if model.dirty or scale_factor != _beams_scale_drawn:
+            draw_model_layers(model, scale_factor)
+        draw_beam_preview(model, mouse_pos)
     except Exception as e:
         print(f"Error in draw_everything: {e}")
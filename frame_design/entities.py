@@ -3,6 +3,28 @@ Entity definitions and management for Motorcycle Frame Design.
 Contains classes for frame model elements like nodes, beams, fixtures, and masses.
 """
 
+import numpy as np
+
+try:  # optional; without it hit testing uses the NumPy brute-force search
+    from scipy.spatial import cKDTree
+except ImportError:
+    cKDTree = None
+
+# Parts of the model the canvas draws on separate layers
+MODEL_PARTS = ("beams", "nodes", "fixtures", "masses")
+
+# Below this many nodes a brute-force search beats building a KD-tree after each edit
+KDTREE_MIN_NODES = 256
+
+def _append_row(buf, n, row):
+    """Store row at index n of buf, doubling its capacity when full; returns the buffer."""
+    if n == len(buf):
+        grown = np.empty((max(2 * n, 16),) + buf.shape[1:], dtype=buf.dtype)
+        grown[:n] = buf
+        buf = grown
+    buf[n] = row
+    return buf
+
 class FrameModel:
     """Model class to store all frame entities."""
     
@@ -11,11 +33,44 @@ class FrameModel:
         self.beams = []
         self.fixtures = []
         self.masses = []
+        # Nodes that already carry a fixture / mass, for O(1) duplicate checks
+        self._fixture_nodes = set()
+        self._mass_nodes = set()
         self.selected_node = None
+        # Parts changed since the canvas last drew them; each part has its own
+        # layer, so only layers listed here are redrawn
+        self.dirty_parts = set(MODEL_PARTS)
+        self.version = 0  # bumped on every change, so views can skip refreshes
+        self.nodes_version = 0  # bumped when nodes are added or removed (positions / indices change)
+        # Array views of the entity dicts for vectorized hit testing and drawing.
+        # Additions append in place (buffers keep spare capacity); removals drop
+        # them and they are rebuilt on first use
+        self._positions = None  # float node positions, first len(nodes) rows valid
+        self._beam_nodes = None  # int beam (start, end) node indices, first len(beams) rows valid
+        self._kdtree = None  # cKDTree over node positions, valid for _kdtree_version
+        self._kdtree_version = -1
+    
+    @property
+    def dirty(self):
+        """True if any part needs redrawing; setting it marks all (True) or none (False)."""
+        return bool(self.dirty_parts)
+    
+    @dirty.setter
+    def dirty(self, value):
+        self.dirty_parts = set(MODEL_PARTS) if value else set()
+    
+    def mark_dirty(self, *parts):
+        """Flag model parts (see MODEL_PARTS) for redraw."""
+        self.dirty_parts.update(parts)
+        self.version += 1
     
     def add_node(self, pos):
         """Add a node at the specified position."""
         self.nodes.append({"pos": pos, "selected": False})
+        self.nodes_version += 1
+        if self._positions is not None:
+            self._positions = _append_row(self._positions, len(self.nodes) - 1, pos)
+        self.mark_dirty("nodes")
         return len(self.nodes) - 1  # Return index of new node
     
     def add_beam(self, start_idx, end_idx):
@@ -23,30 +78,33 @@ class FrameModel:
         if start_idx < len(self.nodes) and end_idx < len(self.nodes):
             # Section can later be assigned from materials catalog (e.g., tube size)
             self.beams.append({"start": start_idx, "end": end_idx, "section": None})
+            if self._beam_nodes is not None:
+                self._beam_nodes = _append_row(self._beam_nodes, len(self.beams) - 1, (start_idx, end_idx))
+            self.mark_dirty("beams")
             return len(self.beams) - 1
         return None
     
     def add_fixture(self, node_idx):
         """Add a fixture to a node."""
         if node_idx < len(self.nodes):
-            # Check if fixture already exists
-            for fixture in self.fixtures:
-                if fixture["node"] == node_idx:
-                    return None  # Already exists
+            if node_idx in self._fixture_nodes:
+                return None  # Already exists
             
             self.fixtures.append({"node": node_idx})
+            self._fixture_nodes.add(node_idx)
+            self.mark_dirty("fixtures")
             return len(self.fixtures) - 1
         return None
     
     def add_mass(self, node_idx, value=100):
         """Add a mass to a node."""
         if node_idx < len(self.nodes):
-            # Check if mass already exists
-            for mass in self.masses:
-                if mass["node"] == node_idx:
-                    return None  # Already exists
+            if node_idx in self._mass_nodes:
+                return None  # Already exists
             
             self.masses.append({"node": node_idx, "value": value})
+            self._mass_nodes.add(node_idx)
+            self.mark_dirty("masses")
             return len(self.masses) - 1
         return None
     
@@ -55,64 +113,91 @@ class FrameModel:
         if node_idx >= len(self.nodes):
             return False
         
-        # Delete connected beams
-        self.beams = [beam for beam in self.beams 
-                     if beam["start"] != node_idx and beam["end"] != node_idx]
-        
-        # Delete connected fixtures
-        self.fixtures = [fixture for fixture in self.fixtures 
-                        if fixture["node"] != node_idx]
+        # Drop connected elements and shift later node indices down by one,
+        # in a single pass per list (bool subtracts as 0/1)
+        beams = []
+        for beam in self.beams:
+            start, end = beam["start"], beam["end"]
+            if start != node_idx and end != node_idx:
+                beam["start"] = start - (start > node_idx)
+                beam["end"] = end - (end > node_idx)
+                beams.append(beam)
+        self.beams = beams
         
-        # Delete connected masses
-        self.masses = [mass for mass in self.masses 
-                      if mass["node"] != node_idx]
+        self.fixtures = self._drop_and_shift(self.fixtures, node_idx)
+        self.masses = self._drop_and_shift(self.masses, node_idx)
+        self._fixture_nodes = {fixture["node"] for fixture in self.fixtures}
+        self._mass_nodes = {mass["node"] for mass in self.masses}
         
         # Delete the node
         self.nodes.pop(node_idx)
-        
-        # Adjust indices in remaining elements
-        for beam in self.beams:
-            if beam["start"] > node_idx:
-                beam["start"] -= 1
-            if beam["end"] > node_idx:
-                beam["end"] -= 1
-        
-        for fixture in self.fixtures:
-            if fixture["node"] > node_idx:
-                fixture["node"] -= 1
-        
-        for mass in self.masses:
-            if mass["node"] > node_idx:
-                mass["node"] -= 1
+        self.nodes_version += 1
+        self._positions = None
+        self._beam_nodes = None
         
         # Reset selected node if deleted
         if self.selected_node == node_idx:
             self.selected_node = None
-        elif self.selected_node > node_idx:
+        elif self.selected_node is not None and self.selected_node > node_idx:
             self.selected_node -= 1
         
+        self.mark_dirty(*MODEL_PARTS)
         return True
     
+    @staticmethod
+    def _drop_and_shift(items, node_idx):
+        """Keep items not attached to node_idx, renumbering nodes above it."""
+        kept = []
+        for item in items:
+            node = item["node"]
+            if node != node_idx:
+                item["node"] = node - (node > node_idx)
+                kept.append(item)
+        return kept
+    
     def clear(self):
         """Clear all entities in the model."""
         self.nodes.clear()
         self.beams.clear()
         self.fixtures.clear()
         self.masses.clear()
+        self._fixture_nodes.clear()
+        self._mass_nodes.clear()
+        self.nodes_version += 1
         self.selected_node = None
+        self._positions = None
+        self._beam_nodes = None
+        self.mark_dirty(*MODEL_PARTS)
+    
+    def node_positions(self):
+        """Node positions as an (N, 2) float array (cached; do not modify)."""
+        if self._positions is None:
+            self._positions = np.array([node["pos"] for node in self.nodes], dtype=float).reshape(-1, 2)
+        return self._positions[:len(self.nodes)]
+    
+    def beam_nodes(self):
+        """Beam (start, end) node indices as an (M, 2) int array (cached; do not modify)."""
+        if self._beam_nodes is None:
+            self._beam_nodes = np.array([(beam["start"], beam["end"]) for beam in self.beams],
+                                        dtype=np.intp).reshape(-1, 2)
+        return self._beam_nodes[:len(self.beams)]
     
     def find_closest_node(self, x, y, max_distance=15):
         """Find index of the closest node to the given coordinates."""
-        min_dist = float('inf')
-        closest_idx = None
-        
-        for i, node in enumerate(self.nodes):
-            node_x, node_y = node["pos"]
-            dist = ((x - node_x)**2 + (y - node_y)**2)**0.5
-            if dist < min_dist and dist <= max_distance:
-                min_dist = dist
-                closest_idx = i
-        
+        if not self.nodes:
+            return None
+        if cKDTree is not None and len(self.nodes) >= KDTREE_MIN_NODES:
+            if self._kdtree_version != self.nodes_version:
+                self._kdtree = cKDTree(self.node_positions())
+                self._kdtree_version = self.nodes_version
+            dist, closest_idx = self._kdtree.query((x, y), k=1)
+            return int(closest_idx) if dist <= max_distance else None
+        # Squared distances in one vectorized pass; no sqrt needed to compare
+        d = self.node_positions() - (x, y)
+        d2 = np.einsum('ij,ij->i', d, d)
+        closest_idx = int(np.argmin(d2))
+        if d2[closest_idx] > max_distance * max_distance:
+            return None
         return closest_idx
     
     def select_node(self, node_idx):
@@ -127,10 +212,12 @@ class FrameModel:
         # Select the specified node
         self.nodes[node_idx]["selected"] = True
         self.selected_node = node_idx
+        self.mark_dirty("nodes")
         return True
     
     def deselect_all_nodes(self):
         """Deselect all nodes."""
         for node in self.nodes:
             node["selected"] = False
-        self.selected_node = None
\ No newline at end of file
+        self.selected_node = None
+        self.mark_dirty("nodes")
\ No newline at end of file
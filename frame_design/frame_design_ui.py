@@ -4,6 +4,13 @@ User interface components for the Motorcycle Frame Designer
 
 import dearpygui.dearpygui as dpg
 
+import sys
+import time
+
+from frame_design.drawing import (CANVAS_LAYERS, PREVIEW_LAYER, PREVIEW_LINE, BEAM_HOVER_COLOR,
+                                  draw_beam_preview)
+from frame_design.utils import get_statistics
+
 # UI Constants
 WINDOW_WIDTH = 1200
 WINDOW_HEIGHT = 800
@@ -11,89 +18,116 @@ SIDEBAR_WIDTH = 250
 CANVAS_WIDTH = WINDOW_WIDTH - SIDEBAR_WIDTH
 CANVAS_HEIGHT = WINDOW_HEIGHT - 50
 
+TOOL_BUTTONS = ("Add Node", "Add Beam", "Add Fixture", "Add Mass", "Delete")
+# Tool button label -> tag of the child_window frame around it
+_FRAME_TAGS = {button: button.replace(" ", "_") + "_frame" for button in TOOL_BUTTONS}
+
+# Tool frame themes, built once by create_ui and rebound on tool changes
+_active_theme = None
+_inactive_theme = None
+
+def _create_tool_themes():
+    """Build the active / inactive tool frame themes (same layout, different colors)."""
+    global _active_theme, _inactive_theme
+    # Create a bold green theme for the active tool
+    with dpg.theme() as _active_theme:
+        with dpg.theme_component(dpg.mvAll):
+            # Bright green background
+            dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (0, 120, 0), category=dpg.mvThemeCat_Core)
+            # Keep consistent styling to avoid layout changes
+            dpg.add_theme_style(dpg.mvStyleVar_ChildRounding, 5, category=dpg.mvThemeCat_Core)
+            # Use the same border size for all states to prevent movement
+            dpg.add_theme_style(dpg.mvStyleVar_ChildBorderSize, 1, category=dpg.mvThemeCat_Core)
+            # Border color for active
+            dpg.add_theme_color(dpg.mvThemeCol_Border, (0, 255, 0), category=dpg.mvThemeCat_Core)
+    # Dark gray background for inactive tools
+    with dpg.theme() as _inactive_theme:
+        with dpg.theme_component(dpg.mvAll):
+            dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (40, 40, 40), category=dpg.mvThemeCat_Core)
+            # Keep consistent styling
+            dpg.add_theme_style(dpg.mvStyleVar_ChildRounding, 5, category=dpg.mvThemeCat_Core)
+            # Use the same border size for all states to prevent movement
+            dpg.add_theme_style(dpg.mvStyleVar_ChildBorderSize, 1, category=dpg.mvThemeCat_Core)
+            # Border color for inactive (dark gray border)
+            dpg.add_theme_color(dpg.mvThemeCol_Border, (60, 60, 60), category=dpg.mvThemeCat_Core)
+
 def highlight_active_tool_button(active_button_label):
     """Highlight the active tool button by coloring its frame without moving buttons."""
-    buttons = ["Add Node", "Add Beam", "Add Fixture", "Add Mass", "Delete"]
-    
-    for button in buttons:
-        try:
-            # Get the frame tag for this button
-            frame_tag = button.replace(" ", "_") + "_frame"
-            
-            # Set frame color based on whether this is the active button
-            if button == active_button_label:
-                # Create a bold green theme for the active tool
-                with dpg.theme() as theme:
-                    with dpg.theme_component(dpg.mvAll):
-                        # Bright green background
-                        dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (0, 120, 0), category=dpg.mvThemeCat_Core)
-                        # Keep consistent styling to avoid layout changes
-                        dpg.add_theme_style(dpg.mvStyleVar_ChildRounding, 5, category=dpg.mvThemeCat_Core)
-                        # Use the same border size for all states to prevent movement
-                        dpg.add_theme_style(dpg.mvStyleVar_ChildBorderSize, 1, category=dpg.mvThemeCat_Core)
-                        # Border color for active
-                        dpg.add_theme_color(dpg.mvThemeCol_Border, (0, 255, 0), category=dpg.mvThemeCat_Core)
-                
-                # Apply the theme to the frame
-                dpg.bind_item_theme(frame_tag, theme)
-            else:
-                # Dark gray background for inactive tools
-                with dpg.theme() as theme:
-                    with dpg.theme_component(dpg.mvAll):
-                        dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (40, 40, 40), category=dpg.mvThemeCat_Core)
-                        # Keep consistent styling
-                        dpg.add_theme_style(dpg.mvStyleVar_ChildRounding, 5, category=dpg.mvThemeCat_Core)
-                        # Use the same border size for all states to prevent movement
-                        dpg.add_theme_style(dpg.mvStyleVar_ChildBorderSize, 1, category=dpg.mvThemeCat_Core)
-                        # Border color for inactive (dark gray border)
-                        dpg.add_theme_color(dpg.mvThemeCol_Border, (60, 60, 60), category=dpg.mvThemeCat_Core)
-                
-                dpg.bind_item_theme(frame_tag, theme)
-            
-        except Exception as e:
-            print(f"Error highlighting button {button}: {e}")
+    if _active_theme is None:
+        _create_tool_themes()
+    for button, frame_tag in _FRAME_TAGS.items():
+        if not dpg.does_item_exist(frame_tag):
+            continue
+        
+        # Set frame color based on whether this is the active button
+        dpg.bind_item_theme(frame_tag, _active_theme if button == active_button_label else _inactive_theme)
+
+_last_stats = {}  # tag -> text last written, so unchanged widgets are not rewritten
+
+def _set_text(tag, text):
+    if _last_stats.get(tag) != text:
+        dpg.set_value(tag, text)
+        _last_stats[tag] = text
+
+_stats_version = None  # model.version the sidebar counts were last written for
 
 def update_stats(model):
-    """Update statistics display."""
-    try:
-        # Update statistics
-        dpg.set_value("node_stats", f"Nodes: {len(model.nodes)}")
-        dpg.set_value("beam_stats", f"Beams: {len(model.beams)}")
-        dpg.set_value("fixture_stats", f"Fixtures: {len(model.fixtures)}")
-        dpg.set_value("mass_stats", f"Masses: {len(model.masses)}")
-        
-        # Update debug info
-        debug_info = f"Selected Node: {model.selected_node}\n"
-        debug_info += f"Mouse Pos: {dpg.get_mouse_pos()}"
-        dpg.set_value("debug_text", debug_info)
-    except Exception as e:
-        print(f"Error updating stats: {e}")
+    """Update statistics display (only the texts that changed)."""
+    global _stats_version
+    # Counts and selection only change with the model
+    if model.version != _stats_version:
+        _stats_version = model.version
+        stats = get_statistics(model)
+        _set_text("node_stats", f"Nodes: {stats['node_count']}")
+        _set_text("beam_stats", f"Beams: {stats['beam_count']}")
+        _set_text("fixture_stats", f"Fixtures: {stats['fixture_count']}")
+        _set_text("mass_stats", f"Masses: {stats['mass_count']}")
+    
+    # Update debug info while it can be seen (whole pixels, so sub-pixel
+    # jitter does not count as a change)
+    if not dpg.is_item_visible("debug_text"):
+        return
+    mouse_x, mouse_y = dpg.get_mouse_pos()
+    debug_info = f"Selected Node: {model.selected_node}\n"
+    debug_info += f"Mouse Pos: [{round(mouse_x)}, {round(mouse_y)}]"
+    _set_text("debug_text", debug_info)
+
+_item_pos_cache = {}  # tag -> position; layout only moves on viewport resize
+
+def get_item_pos_cached(tag):
+    """dpg.get_item_pos(tag), remembered until the viewport is resized."""
+    pos = _item_pos_cache.get(tag)
+    if pos is None:
+        pos = _item_pos_cache[tag] = dpg.get_item_pos(tag)
+    return pos
+
+def invalidate_pos_cache(sender=None, app_data=None):
+    """Forget cached item positions (viewport resized or first layout done)."""
+    _item_pos_cache.clear()
 
 def get_canvas_mouse_pos():
     """Get mouse position relative to canvas origin"""
-    # Get mouse position in screen coordinates
-    mouse_pos = dpg.get_mouse_pos(local=False)
+    # Get mouse position in screen coordinates, in whole pixels
+    mx, my = dpg.get_mouse_pos(local=False)
+    mx, my = int(mx), int(my)
     
-    try:
-        # Get main window position
-        main_window_pos = dpg.get_item_pos("main_window")
-        
-        # Use the same offset calculation as in canvas_click function
-        # for consistent coordinates between clicks and mouse movement
-        WINDOW_PADDING_X = 28   # Window frame width + adjustment
-        WINDOW_PADDING_Y = 57   # Window title bar + frame + adjustment
-        
-        # Calculate position relative to canvas
-        x = mouse_pos[0] - main_window_pos[0] - SIDEBAR_WIDTH - WINDOW_PADDING_X
-        y = mouse_pos[1] - main_window_pos[1] - WINDOW_PADDING_Y
-        
-        # Ensure coordinates are within canvas bounds
-        if 0 <= x <= CANVAS_WIDTH and 0 <= y <= CANVAS_HEIGHT:
-            return (x, y)
-            
-    except Exception as e:
-        print(f"Error getting canvas mouse position: {e}")
-        
+    if not dpg.does_item_exist("main_window"):
+        return None
+    # Get main window position
+    main_window_pos = get_item_pos_cached("main_window")
+    
+    # Use the same offset calculation as in canvas_click function
+    # for consistent coordinates between clicks and mouse movement
+    WINDOW_PADDING_X = 28   # Window frame width + adjustment
+    WINDOW_PADDING_Y = 57   # Window title bar + frame + adjustment
+    
+    # Calculate position relative to canvas
+    x = mx - main_window_pos[0] - SIDEBAR_WIDTH - WINDOW_PADDING_X
+    y = my - main_window_pos[1] - WINDOW_PADDING_Y
+    
+    # Ensure coordinates are within canvas bounds
+    if 0 <= x <= CANVAS_WIDTH and 0 <= y <= CANVAS_HEIGHT:
+        return (x, y)
     return None
 
 def create_ui(add_node_callback, add_beam_callback, add_fixture_callback, 
@@ -108,13 +142,10 @@ def create_ui(add_node_callback, add_beam_callback, add_fixture_callback,
                 
                 # Tool buttons with highlighted frames
                 with dpg.group():
-                    # Create a base theme for all buttons to ensure consistent layout
-                    with dpg.theme() as button_base_theme:
-                        with dpg.theme_component(dpg.mvAll):
-                            dpg.add_theme_style(dpg.mvStyleVar_ChildRounding, 5, category=dpg.mvThemeCat_Core)
-                            dpg.add_theme_style(dpg.mvStyleVar_ChildBorderSize, 1, category=dpg.mvThemeCat_Core)
-                            dpg.add_theme_color(dpg.mvThemeCol_Border, (60, 60, 60), category=dpg.mvThemeCat_Core)
-                            dpg.add_theme_color(dpg.mvThemeCol_ChildBg, (40, 40, 40), category=dpg.mvThemeCat_Core)
+                    # Tool frame themes; every frame starts with the inactive one so
+                    # highlighting only swaps colors, never layout
+                    _create_tool_themes()
+                    button_base_theme = _inactive_theme
                     
                     # Add Node - using child_window for better styling control
                     with dpg.child_window(height=35, width=200, tag="Add_Node_frame", no_scrollbar=True):
@@ -183,49 +214,108 @@ def create_ui(add_node_callback, add_beam_callback, add_fixture_callback,
             with dpg.child_window(width=CANVAS_WIDTH, height=CANVAS_HEIGHT, tag="canvas_window"):
                 # Create a drawlist for our canvas
                 with dpg.drawlist(width=CANVAS_WIDTH, height=CANVAS_HEIGHT, tag="canvas"):
-                    pass  # Canvas will be drawn in drawing.py
+                    # Persistent layers (bottom to top), filled in drawing.py: the grid
+                    # only changes with the scale, each model part's layer only after
+                    # edits to that part
+                    for layer in CANVAS_LAYERS:
+                        dpg.add_draw_layer(tag=layer)
+                    # Rubber-band beam preview: one persistent line, moved by the mouse handlers
+                    dpg.draw_line((0, 0), (0, 0), color=BEAM_HOVER_COLOR, thickness=1, style=2,
+                                  parent=PREVIEW_LAYER, tag=PREVIEW_LINE, show=False)
+                
+                # Item positions are cached between events; drop them when the
+                # layout can change (first laid-out frame, viewport resize)
+                dpg.set_frame_callback(2, invalidate_pos_cache)
+                dpg.set_viewport_resize_callback(invalidate_pos_cache)
                 
                 # Set up mouse handlers using the proper method
                 with dpg.handler_registry():
                     dpg.add_mouse_click_handler(callback=canvas_click_callback)
                     
-                    # Add hover/move handler for beam preview
-                    dpg.add_mouse_move_handler(callback=lambda sender, app_data: on_mouse_move())
+                    # Add hover/move handler for beam preview; it only records the
+                    # position, applied once per frame by flush_mouse_move()
+                    dpg.add_mouse_move_handler(callback=record_mouse_move)
+
+_main_mod = None  # application module holding selected_tool / model (see bind_main)
+
+def bind_main(module):
+    """Register the application module the mouse callbacks read tool and model from."""
+    global _main_mod
+    _main_mod = module
+
+def _beam_preview_model():
+    """The model if the beam tool is active with a node selected, else None."""
+    main = _main_mod if _main_mod is not None else sys.modules['__main__']
+    try:
+        if main.selected_tool != "beam":
+            return None
+        model = main.model
+    except AttributeError:
+        return None
+    return model if model.selected_node is not None else None
 
 def on_mouse_hover(sender, app_data):
-    """Handle mouse movement over canvas for beam preview"""
-    # Get the model and selected tool from main module
-    import sys
-    main = sys.modules['__main__']
-    
-    if hasattr(main, 'selected_tool') and main.selected_tool == "beam":
-        if hasattr(main, 'model') and main.model.selected_node is not None:
-            # Get local mouse position within canvas
-            mouse_pos = dpg.get_mouse_pos(local=True)
-            if mouse_pos:
-                # Draw beam preview
-                from frame_design.drawing import draw_everything
-                grid_scale = main.grid_scale_factor if hasattr(main, 'grid_scale_factor') else 1.0
-                draw_everything(main.model, mouse_pos, grid_scale)
-
-def on_mouse_move():
+    """Handle mouse movement over canvas for beam preview (deferred like mouse moves)."""
+    record_mouse_move(sender, app_data)
+
+# Frame pacing: nothing on the canvas animates, so the main loop renders at the
+# idle rate unless the user has interacted within the last INTERACTIVE_HOLD seconds
+IDLE_FRAME_INTERVAL = 1 / 10
+ACTIVE_FRAME_INTERVAL = 1 / 60
+INTERACTIVE_HOLD = 0.5
+_interactive_until = 0.0  # time.monotonic() until which frames run at the active rate
+
+def mark_interactive():
+    """Run the main loop at the active frame rate for the next INTERACTIVE_HOLD seconds."""
+    global _interactive_until
+    _interactive_until = time.monotonic() + INTERACTIVE_HOLD
+
+def frame_interval():
+    """Seconds the main loop should spend per frame right now."""
+    return ACTIVE_FRAME_INTERVAL if time.monotonic() < _interactive_until else IDLE_FRAME_INTERVAL
+
+_pending_mouse_pos = None  # latest unprocessed mouse position (screen coordinates)
+
+def record_mouse_move(sender=None, app_data=None):
+    """Mouse-move handler: keep only the latest position; events can outpace frames."""
+    global _pending_mouse_pos
+    mark_interactive()
+    # Only the beam preview follows the mouse; skip the position query otherwise
+    if _beam_preview_model() is not None:
+        _pending_mouse_pos = dpg.get_mouse_pos(local=False)
+
+def flush_mouse_move():
+    """Apply the latest recorded mouse move, if any. Call once per rendered frame."""
+    global _pending_mouse_pos
+    if _pending_mouse_pos is not None:
+        mouse_pos, _pending_mouse_pos = _pending_mouse_pos, None
+        on_mouse_move(mouse_pos)
+
+_last_preview = None  # (x, y, selected node) the preview line was last moved to
+
+def on_mouse_move(mouse_pos=None):
     """Handle mouse movement for beam preview"""
-    # Get the mouse position
-    mouse_pos = dpg.get_mouse_pos(local=False)
+    global _last_preview
+    # Only process if we're in beam mode with a selected node
+    model = _beam_preview_model()
+    if model is None:
+        return
+    
+    # Get the mouse position, in whole pixels
+    if mouse_pos is None:
+        mouse_pos = dpg.get_mouse_pos(local=False)
+    mx, my = int(mouse_pos[0]), int(mouse_pos[1])
     
     # Transform to canvas coordinates
-    canvas_pos = dpg.get_item_pos("canvas")
-    x = mouse_pos[0] - canvas_pos[0]
-    y = mouse_pos[1] - canvas_pos[1]
+    canvas_pos = get_item_pos_cached("canvas")
+    x = mx - canvas_pos[0]
+    y = my - canvas_pos[1]
     
-    # Get the model and selected tool from main module
-    import sys
-    main = sys.modules['__main__']
+    # Skip moves that stay within the same pixel
+    key = (x, y, model.selected_node)
+    if key == _last_preview:
+        return
+    _last_preview = key
     
-    if hasattr(main, 'selected_tool') and main.selected_tool == "beam":
-        if hasattr(main, 'model') and main.model.selected_node is not None:
-            # Only process if we're in beam mode with a selected node
-            # Draw beam preview
-            from frame_design.drawing import draw_everything
-            grid_scale = main.grid_scale_factor if hasattr(main, 'grid_scale_factor') else 1.0
-            draw_everything(main.model, (x, y), grid_scale)
\ No newline at end of file
+    # Move the beam preview line; nothing else on the canvas changes
+    draw_beam_preview(model, (x, y))
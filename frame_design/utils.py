@@ -4,72 +4,113 @@ Contains helper functions and utilities used across the application.
 """
 
 import os
+import sys
 import json
+from math import hypot
+from functools import lru_cache
+import numpy as np
 import dearpygui.dearpygui as dpg
 
+# Arial location per platform; other platforms' paths are only tried as a fallback
+_PLATFORM_FONT_PATHS = {
+    "win32": "C:/Windows/Fonts/arial.ttf",
+    "darwin": "/Library/Fonts/Arial.ttf",
+    "linux": "/usr/share/fonts/truetype/msttcorefonts/arial.ttf"  # Some Linux
+}
+# Arial locations to try, in order: this platform's first
+FONT_PATHS = tuple(sorted(_PLATFORM_FONT_PATHS.values(),
+                          key=lambda path: path != _PLATFORM_FONT_PATHS.get(sys.platform)))
+
+@lru_cache(maxsize=1)
+def _find_arial():
+    """First existing Arial path on this system (or None); probed once per process."""
+    for path in FONT_PATHS:
+        try:
+            os.stat(path)
+        except OSError:
+            continue
+        return path
+    return None
+
+_loaded_font = None  # default font id once registered; load_fonts is idempotent
+
 def load_fonts():
     """Load fonts for the application."""
+    global _loaded_font
+    if _loaded_font is not None:
+        return _loaded_font
     try:
+        arial_path = _find_arial()
+        if not arial_path:
+            print("Arial font not found, using default font")
+            return None
         with dpg.font_registry():
-            # Try to find Arial on the system
-            font_paths = [
-                "C:/Windows/Fonts/arial.ttf",  # Windows
-                "/Library/Fonts/Arial.ttf",    # macOS
-                "/usr/share/fonts/truetype/msttcorefonts/arial.ttf"  # Some Linux
-            ]
-            
-            arial_path = None
-            for path in font_paths:
-                if os.path.exists(path):
-                    arial_path = path
-                    break
-            
-            if arial_path:
-                # Load Arial with various sizes
-                default_font = dpg.add_font(arial_path, 14)
-                large_font = dpg.add_font(arial_path, 18)
-                small_font = dpg.add_font(arial_path, 12)
-                dpg.bind_font(default_font)
-                return default_font
-            else:
-                print("Arial font not found, using default font")
-                return None
+            # Load Arial with various sizes
+            default_font = dpg.add_font(arial_path, 14)
+            large_font = dpg.add_font(arial_path, 18)
+            small_font = dpg.add_font(arial_path, 12)
+            dpg.bind_font(default_font)
+        _loaded_font = default_font
+        return default_font
     except Exception as e:
         print(f"Error loading fonts: {e}")
         return None
 
 def distance(p1, p2):
     """Calculate Euclidean distance between two points."""
-    return ((p2[0] - p1[0]) ** 2 + (p2[1] - p1[1]) ** 2) ** 0.5
+    return hypot(p2[0] - p1[0], p2[1] - p1[1])
 
 def midpoint(p1, p2):
     """Calculate the midpoint between two points."""
-    return ((p1[0] + p2[0]) / 2, (p1[1] + p2[1]) / 2)
+    x1, y1 = p1
+    x2, y2 = p2
+    return ((x1 + x2) * 0.5, (y1 + y2) * 0.5)
 
 def calculate_beam_length(model, beam):
-    """Calculate the length of a beam."""
-    if beam["start"] < len(model.nodes) and beam["end"] < len(model.nodes):
-        start_pos = model.nodes[beam["start"]]["pos"]
-        end_pos = model.nodes[beam["end"]]["pos"]
-        return distance(start_pos, end_pos)
+    """Calculate the length of a beam (from the model's cached position array)."""
+    pos = model.node_positions()
+    start, end = beam["start"], beam["end"]
+    if start < len(pos) and end < len(pos):
+        (x1, y1), (x2, y2) = pos[start], pos[end]
+        return hypot(x2 - x1, y2 - y1)
     return 0
 
+def total_beam_length(model):
+    """Sum of all beam lengths, from the model's cached position/index arrays."""
+    pos = model.node_positions()
+    ends = model.beam_nodes()
+    ends = ends[(ends < len(pos)).all(axis=1)]
+    d = pos[ends[:, 1]] - pos[ends[:, 0]]
+    return float(np.hypot(d[:, 0], d[:, 1]).sum())
+
+_stats_cache = None  # (model, model.version, stats) of the last get_statistics call
+
 def get_statistics(model):
-    """Calculate statistics for the model."""
+    """Calculate statistics for the model (recomputed only after the model changes)."""
+    global _stats_cache
+    if _stats_cache is not None and _stats_cache[0] is model and _stats_cache[1] == model.version:
+        return dict(_stats_cache[2])
+    masses = np.fromiter((mass.get("value", 0) for mass in model.masses),
+                         dtype=np.float64, count=len(model.masses))
     stats = {
         "node_count": len(model.nodes),
         "beam_count": len(model.beams),
         "fixture_count": len(model.fixtures),
         "mass_count": len(model.masses),
-        "total_mass": sum(mass.get("value", 0) for mass in model.masses),
-        "total_beam_length": sum(calculate_beam_length(model, beam) for beam in model.beams)
+        "total_mass": float(masses.sum()),
+        "total_beam_length": total_beam_length(model)
     }
-    return stats
+    _stats_cache = (model, model.version, stats)
+    return dict(stats)
 
 _materials_cache = None
 
 def load_materials(json_path="materials.json"):
-    """Load materials/sections catalog once (cached). Returns list of entries."""
+    """Load materials/sections catalog once (cached).
+
+    Returns a dict of entry lists keyed by shape (e.g. "round_tube",
+    "square_tube"), plus "all" holding every entry in catalog order.
+    """
     global _materials_cache
     if _materials_cache is not None:
         return _materials_cache
@@ -80,10 +121,15 @@ def load_materials(json_path="materials.json"):
             json_path = os.path.join(base_dir, json_path)
         with open(json_path, 'r') as f:
             data = json.load(f)
-        _materials_cache = data.get("materials", [])
+        entries = data.get("materials", [])
     except Exception as e:
         print(f"Failed to load materials catalog: {e}")
-        _materials_cache = []
+        entries = []
+    buckets = {}
+    for entry in entries:
+        buckets.setdefault(entry.get("shape", "other"), []).append(entry)
+    buckets["all"] = entries
+    _materials_cache = buckets
     return _materials_cache
 
 def format_section_label(entry):
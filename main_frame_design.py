@@ -14,50 +14,109 @@ Safe to delete once full feature parity & data migration are confirmed.
 ---------------------------------------------------------------------
 """
 
-import os
+import logging
 import sys
+import time
 import dearpygui.dearpygui as dpg
 
-# Ensure the frame_design package can be imported
-sys.path.append(os.path.dirname(os.path.abspath(__file__)))
-
-# Import from frame_design package
+# Import from frame_design package (next to this script, so already on sys.path
+# when run as `python main_frame_design.py`)
 from frame_design.entities import FrameModel
 from frame_design.drawing import draw_grid, draw_everything, CANVAS_WIDTH, CANVAS_HEIGHT
-from frame_design.frame_design_ui import create_ui, update_stats, get_canvas_mouse_pos, highlight_active_tool_button
+from frame_design.frame_design_ui import create_ui, update_stats, highlight_active_tool_button, flush_mouse_move, get_item_pos_cached, bind_main, mark_interactive, frame_interval
 from frame_design.utils import load_fonts, load_materials, format_section_label
 
+logger = logging.getLogger(__name__)
+
+STATS_INTERVAL = 0.2  # seconds between sidebar refreshes while the model is unchanged
+
 # Global variables
 model = FrameModel()
 selected_tool = None
 grid_scale_factor = 1.0  # Default scale: 1 grid cell = 1 unit
-materials_catalog = []
+materials_catalog = {}  # entry lists by shape, see load_materials
+# Section selector contents, built once per catalog load by index_materials_catalog()
+_round_labels = ()
+_square_labels = ()
+_sections_by_label = {}  # listbox label -> catalog entry (listboxes report the label)
+
+def index_materials_catalog():
+    """Format the round / square tube labels once."""
+    global _round_labels, _square_labels, _sections_by_label
+    round_entries = materials_catalog.get("round_tube", [])
+    square_entries = materials_catalog.get("square_tube", [])
+    _round_labels = tuple(format_section_label(e) for e in round_entries)
+    _square_labels = tuple(format_section_label(e) for e in square_entries)
+    _sections_by_label = {}
+    for label, entry in zip(_round_labels + _square_labels, round_entries + square_entries):
+        _sections_by_label.setdefault(label, entry)
+
+def _beam_list_labels():
+    """(beam index, label) for every beam whose nodes exist, in beam order."""
+    n_nodes = len(model.nodes)
+    rows = []
+    for i, beam in enumerate(model.beams):
+        start = beam.get("start")
+        end = beam.get("end")
+        if start is None or end is None or start >= n_nodes or end >= n_nodes:
+            continue
+        sec = beam.get("section")
+        if not sec:
+            rows.append((i, f"B{i}: N{start}-N{end}"))
+            continue
+        shape = sec.get("shape")
+        if shape == "round_tube":
+            size = f"{sec.get('outer_diameter_in',0):.2f}x{sec.get('wall_thickness_in',0):.3f}"
+        elif shape == "square_tube":
+            size = f"{sec.get('outer_width_in',0):.2f}sq {sec.get('wall_thickness_in',0):.3f}"
+        else:
+            size = ""
+        rows.append((i, f"B{i}: N{start}-N{end} | {size}"))
+    return rows
+
+_beam_list = None  # item id of the "beam_list_group" child window, once it exists
+_beam_list_rows = []  # one [group, text, button, beam index, label] per displayed row
 
 def rebuild_beam_list():
-    """Recreate the beam list UI with section assignment buttons."""
+    """Sync the beam list UI (with section assignment buttons) to the model.
+
+    Rows are reused: only changed labels / beam indices are updated, new rows
+    appended and surplus rows deleted, instead of recreating every widget.
+    """
+    global _beam_list
     try:
-        if not dpg.does_item_exist("beam_list_group"):
-            return
-        dpg.delete_item("beam_list_group", children_only=True)
-        for i, beam in enumerate(model.beams):
-            start = beam.get("start")
-            end = beam.get("end")
-            if start is None or end is None or start >= len(model.nodes) or end >= len(model.nodes):
-                continue
-            label = f"B{i}: N{start}-N{end}"
-            if beam.get("section"):
-                sec = beam["section"]
-                label += " | "
-                if sec.get("shape") == "round_tube":
-                    label += f"{sec.get('outer_diameter_in',0):.2f}x{sec.get('wall_thickness_in',0):.3f}"
-                elif sec.get("shape") == "square_tube":
-                    label += f"{sec.get('outer_width_in',0):.2f}sq {sec.get('wall_thickness_in',0):.3f}"
-            with dpg.group(parent="beam_list_group"):
-                dpg.add_text(label)
-                dpg.add_button(label="Set Section", width=120, callback=lambda s,a,b_idx=i: open_section_selector(b_idx))
+        if _beam_list is None:
+            if not dpg.does_item_exist("beam_list_group"):
+                return
+            _beam_list = dpg.get_alias_id("beam_list_group")
+        wanted = _beam_list_labels()
+        for row, (i, label) in zip(_beam_list_rows, wanted):
+            if row[4] != label:
+                dpg.set_value(row[1], label)
+                row[4] = label
+            if row[3] != i:
+                dpg.configure_item(row[2], user_data=i)
+                row[3] = i
+        for row in _beam_list_rows[len(wanted):]:
+            dpg.delete_item(row[0])
+        del _beam_list_rows[len(wanted):]
+        for i, label in wanted[len(_beam_list_rows):]:
+            with dpg.group(parent=_beam_list) as group:
+                text = dpg.add_text(label)
+                button = dpg.add_button(label="Set Section", width=120, user_data=i,
+                                        callback=_on_set_section)
                 dpg.add_separator()
+            _beam_list_rows.append([group, text, button, i, label])
     except Exception as e:
-        print(f"Error rebuilding beam list: {e}")
+        logger.error("Error rebuilding beam list: %s", e)
+
+def _on_set_section(sender, app_data, beam_index):
+    """Beam list "Set Section" button; user_data is the beam index."""
+    open_section_selector(beam_index)
+
+def _on_section_chosen(sender, label, beam_index):
+    """Section selector listbox; app_data is the chosen label, user_data the beam index."""
+    _assign_section(beam_index, _sections_by_label[label])
 
 def open_section_selector(beam_index:int):
     """Open a popup window listing available sections to assign to beam."""
@@ -67,82 +126,95 @@ def open_section_selector(beam_index:int):
         dpg.delete_item("section_selector_window")
     with dpg.window(label=f"Select Section for B{beam_index}", modal=True, tag="section_selector_window", width=430, height=500):
         dpg.add_text("Round Tubes")
-        round_entries = [e for e in materials_catalog if e.get("shape") == "round_tube"]
-        round_labels = [format_section_label(e) for e in round_entries]
-        dpg.add_listbox(round_labels, num_items=8, callback=lambda s,a: _assign_section(beam_index, round_entries[a]), width=-1)
+        dpg.add_listbox(_round_labels, num_items=8, callback=_on_section_chosen, user_data=beam_index, width=-1)
         dpg.add_separator()
         dpg.add_text("Square Tubes")
-        square_entries = [e for e in materials_catalog if e.get("shape") == "square_tube"]
-        square_labels = [format_section_label(e) for e in square_entries]
-        dpg.add_listbox(square_labels, num_items=8, callback=lambda s,a: _assign_section(beam_index, square_entries[a]), width=-1)
+        dpg.add_listbox(_square_labels, num_items=8, callback=_on_section_chosen, user_data=beam_index, width=-1)
         dpg.add_button(label="Close", callback=lambda: dpg.delete_item("section_selector_window"))
 
 def _assign_section(beam_index, section_entry):
     model.beams[beam_index]["section"] = section_entry
+    model.mark_dirty("beams")
     if dpg.does_item_exist("section_selector_window"):
         dpg.delete_item("section_selector_window")
     rebuild_beam_list()
-    draw_everything(model, None, grid_scale_factor)
 
 # Callback functions
 def add_node_callback():
     global selected_tool
+    if selected_tool == "node":
+        return
     selected_tool = "node"
-    print("Node tool selected")
+    logger.debug("Node tool selected")
     highlight_active_tool_button("Add Node")
 
 def add_beam_callback():
     global selected_tool
+    if selected_tool == "beam" and model.selected_node is None:
+        return
     selected_tool = "beam"
-    model.deselect_all_nodes()
-    print("Beam tool selected")
+    # Re-clicking the beam tool still cancels a half-placed beam
+    if model.selected_node is not None:
+        model.deselect_all_nodes()
+    logger.debug("Beam tool selected")
     highlight_active_tool_button("Add Beam")
-    draw_everything(model)
     rebuild_beam_list()
 
 def add_fixture_callback():
     global selected_tool
+    if selected_tool == "fixture":
+        return
     selected_tool = "fixture"
-    print("Fixture tool selected")
+    logger.debug("Fixture tool selected")
     highlight_active_tool_button("Add Fixture")
 
 def add_mass_callback():
     global selected_tool
+    if selected_tool == "mass":
+        return
     selected_tool = "mass"
-    print("Mass tool selected")
+    logger.debug("Mass tool selected")
     highlight_active_tool_button("Add Mass")
 
 def delete_callback():
     global selected_tool
+    if selected_tool == "delete":
+        return
     selected_tool = "delete"
-    print("Delete tool selected")
+    logger.debug("Delete tool selected")
     highlight_active_tool_button("Delete")
 
 def clear_all_callback():
     global model
     model.clear()
-    print("All entities cleared")
-    draw_everything(model)
+    logger.debug("All entities cleared")
     rebuild_beam_list()
 
 def canvas_click(sender, app_data):
     """Handle mouse clicks on the canvas"""
     global selected_tool, model
     
-    print("\n--- CANVAS CLICK ---")
+    logger.debug("--- CANVAS CLICK ---")
+    mark_interactive()
+    if selected_tool is None:
+        return
     
     # Get mouse position and convert to canvas coordinates
     mouse_pos = dpg.get_mouse_pos(local=False)
-    canvas_pos = dpg.get_item_pos("canvas")
+    canvas_pos = get_item_pos_cached("canvas")
     x = mouse_pos[0] - canvas_pos[0]
     y = mouse_pos[1] - canvas_pos[1]
     
-    print(f"Canvas position: {x}, {y}")
+    # The click handler is global; ignore clicks that land outside the canvas
+    if not (0 <= x <= CANVAS_WIDTH and 0 <= y <= CANVAS_HEIGHT):
+        return
+    
+    logger.debug("Canvas position: %s, %s", x, y)
     
     # Handle different tool actions
     if selected_tool == "node":
         model.add_node((x, y))
-        print(f"Added node at {x}, {y}")
+        logger.debug("Added node at %s, %s", x, y)
     
     # ... rest of the function remains unchanged 
     elif selected_tool == "beam" and len(model.nodes) >= 1:
@@ -151,56 +223,58 @@ def canvas_click(sender, app_data):
             if model.selected_node is None:
                 # Select this node as start
                 model.select_node(closest_idx)
-                print(f"Selected node {closest_idx} for beam start")
+                logger.debug("Selected node %s for beam start", closest_idx)
             elif model.selected_node != closest_idx:
                 # Create beam between selected and this node
                 model.add_beam(model.selected_node, closest_idx)
-                print(f"Created beam from {model.selected_node} to {closest_idx}")
+                logger.debug("Created beam from %s to %s", model.selected_node, closest_idx)
                 model.deselect_all_nodes()
                 rebuild_beam_list()
             else:
                 # Deselect if clicking same node
                 model.deselect_all_nodes()
-                print("Deselected node")
+                logger.debug("Deselected node")
                 
     elif selected_tool == "fixture" and len(model.nodes) > 0:
         closest_idx = model.find_closest_node(x, y)
         if closest_idx is not None:
             if model.add_fixture(closest_idx) is not None:
-                print(f"Added fixture to node {closest_idx}")
+                logger.debug("Added fixture to node %s", closest_idx)
             else:
-                print(f"Node {closest_idx} already has a fixture")
+                logger.debug("Node %s already has a fixture", closest_idx)
                 
     elif selected_tool == "mass" and len(model.nodes) > 0:
         closest_idx = model.find_closest_node(x, y)
         if closest_idx is not None:
-            # Get mass value from input field
-            try:
-                mass_value = dpg.get_value("mass_value_input")
-                if mass_value is None:
-                    mass_value = 100
-            except:
-                mass_value = 100  # Default
+            # Get mass value from input field (default 100 if it is missing or empty)
+            mass_value = dpg.get_value("mass_value_input") if dpg.does_item_exist("mass_value_input") else None
+            if mass_value is None:
+                mass_value = 100
             
             if model.add_mass(closest_idx, mass_value) is not None:
-                print(f"Added {mass_value}kg mass to node {closest_idx}")
+                logger.debug("Added %skg mass to node %s", mass_value, closest_idx)
             else:
-                print(f"Node {closest_idx} already has a mass")
+                logger.debug("Node %s already has a mass", closest_idx)
                 
     elif selected_tool == "delete":
         node_idx = model.find_closest_node(x, y)
         if node_idx is not None:
             model.delete_node(node_idx)
-            print(f"Deleted node {node_idx} and related elements")
+            logger.debug("Deleted node %s and related elements", node_idx)
+            rebuild_beam_list()
     
-    draw_everything(model, None, grid_scale_factor)
+    # The main loop redraws whatever the click changed (model.dirty_parts)
 
 def main():
+    # Event traces are debug level; raise to logging.DEBUG to follow clicks and tool changes
+    logging.basicConfig(level=logging.WARNING, format="[%(levelname)s] %(message)s")
+    
     # Initialize DearPyGui
     dpg.create_context()
     
     # Configure viewport
-    dpg.create_viewport(title="Motorcycle Frame Designer", width=1200, height=800)
+    # No vsync: the main loop paces frames itself (see frame_interval)
+    dpg.create_viewport(title="Motorcycle Frame Designer", width=1200, height=800, vsync=False)
     
     # Load fonts
     load_fonts()
@@ -208,6 +282,10 @@ def main():
     # Load materials catalog
     global materials_catalog
     materials_catalog = load_materials()
+    index_materials_catalog()
+
+    # Mouse callbacks read selected_tool / model from this module
+    bind_main(sys.modules[__name__])
 
     # Create the UI with our callbacks
     create_ui(
@@ -234,31 +312,40 @@ def main():
     add_node_callback()
     rebuild_beam_list()
     
-    # Main loop
+    # Main loop; per-frame UI updates report their errors here and the loop carries on
+    next_stats = 0.0  # time.monotonic() at which the sidebar is refreshed regardless of edits
+    stats_version = None
+    # Loop-invariant callables bound once
+    is_running, render_frame = dpg.is_dearpygui_running, dpg.render_dearpygui_frame
+    monotonic, sleep = time.monotonic, time.sleep
     try:
-        last_mouse_pos = None
-        while dpg.is_dearpygui_running():
-            # For beam preview
-            if selected_tool == "beam" and model.selected_node is not None:
-                # Get mouse position
-                mouse_pos = dpg.get_mouse_pos(local=False)
-                canvas_pos = dpg.get_item_rect_min("canvas")
+        while is_running():
+            frame_start = monotonic()
+            try:
+                # Redraw once per frame, and only if a callback changed the model
+                if model.dirty:
+                    draw_everything(model, None, grid_scale_factor)
                 
-                # Calculate position relative to canvas
-                x = mouse_pos[0] - canvas_pos[0]
-                y = mouse_pos[1] - canvas_pos[1]
+                # Beam preview: apply the mouse moves recorded since the last frame, once
+                flush_mouse_move()
                 
-                # Only redraw when mouse has moved
-                current_pos = (x, y)
-                if current_pos != last_mouse_pos:
-                    last_mouse_pos = current_pos
-                    draw_everything(model, current_pos, grid_scale_factor)
+                # Sidebar: immediately after edits, otherwise a few times a second
+                # (the debug panel tracks the mouse)
+                if model.version != stats_version or frame_start >= next_stats:
+                    update_stats(model)
+                    stats_version = model.version
+                    next_stats = frame_start + STATS_INTERVAL
+            except Exception as e:
+                logger.error("Error updating UI: %s", e)
+            render_frame()
             
-            update_stats(model)
-            dpg.render_dearpygui_frame()
+            # Idle at a low frame rate; full rate for a moment after any input
+            remaining = frame_interval() - (monotonic() - frame_start)
+            if remaining > 0:
+                sleep(remaining)
             
     except Exception as e:
-        print(f"Error in application: {e}")
+        logger.error("Error in application: %s", e)
     finally:
         dpg.destroy_context()
 